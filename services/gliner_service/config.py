@@ -4,13 +4,27 @@ Configuration for GLiNER Entity Extraction Service.
 Loads domain presets from entity-extraction.yaml for easy customization.
 """
 
+import functools
 import logging
+import os
+import sys
+import tempfile
+from collections.abc import Mapping
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from types import MappingProxyType
+from typing import Any, Literal, NamedTuple
 
+import msgspec
 import yaml
 from pydantic_settings import BaseSettings
-from pydantic import Field
+from pydantic import Field, field_validator
+
+# Prefer the libyaml-backed loader (C parser), fall back to the pure-Python one
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
 
 logger = logging.getLogger(__name__)
 
@@ -32,22 +46,71 @@ class Settings(BaseSettings):
         default="cuda",
         description="Device for inference (cpu/cuda)"
     )
+    precision: Literal["fp32", "int8", "bf16", "fp16"] = Field(
+        default="fp32",
+        description=(
+            "Inference precision (int8: dynamic quantization of Linear layers, CPU only; "
+            "bf16/fp16: half-precision encoder under autocast, CUDA only)"
+        )
+    )
+    num_threads: int | None = Field(
+        default=None,
+        ge=1,
+        description="Intra-op CPU threads for inference (default: torch default)"
+    )
+    compile_model: bool = Field(
+        default=False,
+        description="Compile the encoder with torch.compile (warmup pass at model load)"
+    )
+    eager_load: bool = Field(
+        default=False,
+        description="Load and warm up the model in the background at startup (otherwise on first request)"
+    )
 
     # API settings
     host: str = Field(default="0.0.0.0")
     port: int = Field(default=6971)
+    workers: int = Field(default=1, ge=1, description="Uvicorn worker processes (each loads its own model)")
+    reload: bool = Field(default=False, description="Restart on code changes (development only)")
 
     # Processing settings
     default_batch_size: int = Field(default=32, ge=1, le=128)
     confidence_threshold: float = Field(default=0.85, ge=0.0, le=1.0)
+    max_mem_fraction: float = Field(
+        default=0.8,
+        gt=0.0,
+        le=1.0,
+        description="Fraction of GPU memory batches may use (measured during warmup, see eager_load)"
+    )
+    classify_min_words: int = Field(
+        default=0,
+        ge=0,
+        description="Texts with fewer words skip domain classification in auto mode (all-domains schema)"
+    )
+    coalesce_window_ms: float = Field(
+        default=10.0,
+        ge=0.0,
+        description="How long /extract waits to batch concurrent requests together (0 disables)"
+    )
+    schema_cache_size: int = Field(
+        default=64,
+        ge=1,
+        description="Max number of GLiNER2 schemas (label sets) kept for reuse"
+    )
+    classify_cache_size: int = Field(
+        default=10_000,
+        ge=0,
+        description="Max number of domain classifications cached by text hash (0 disables)"
+    )
 
     # Path to YAML config (can be overridden)
-    config_path: str = Field(
-        default=str(YAML_CONFIG_PATH),
+    config_path: Path = Field(
+        default=YAML_CONFIG_PATH,
+        validate_default=True,
         description="Path to entity-extraction.yaml"
     )
 
-    # These will be loaded from YAML but can be overridden via env
+    # Defaults are loaded from YAML but can be overridden via env
     default_entity_types: list[str] | None = Field(default=None)
     default_relation_types: dict[str, str] | None = Field(default=None)
 
@@ -55,26 +118,120 @@ class Settings(BaseSettings):
         env_prefix = "GLINER_"
         env_file = ".env"
 
+    @field_validator("config_path")
+    @classmethod
+    def resolve_config_path(cls, value: Path) -> Path:
+        """Resolve the config path once and warn early if it is missing."""
+        path = value.expanduser().resolve(strict=False)
+        if not path.is_file():
+            logger.warning(f"Config file not found: {path}, using defaults")
+        return path
+
+
+class _ConfigCache(msgspec.Struct):
+    """Parsed YAML config, stamped with the (st_mtime_ns, st_size) of the file it came from."""
+
+    stamp: tuple[int, int]
+    config: dict[str, Any]
+
+
+# Plain JSON, not pickle: loading the sidecar must not run code, like SafeLoader
+_config_cache_encoder = msgspec.json.Encoder()
+_config_cache_decoder = msgspec.json.Decoder(_ConfigCache)
+
+
+def _read_config_cache(cache_path: Path, yaml_stamp: tuple[int, int]) -> dict[str, Any] | None:
+    """Return the cached config if it was parsed from a YAML with this exact (mtime_ns, size)."""
+    try:
+        with open(cache_path, "rb") as f:
+            cached = _config_cache_decoder.decode(f.read())
+        return cached.config if cached.stamp == yaml_stamp else None
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.debug(f"Ignoring unreadable config cache {cache_path}: {e}")
+        return None
+
+
+def _write_config_cache(cache_path: Path, yaml_stamp: tuple[int, int], config: dict[str, Any]) -> None:
+    """Atomically write the parsed config, stamped with its YAML's stat, next to the YAML file."""
+    try:
+        body = _config_cache_encoder.encode(_ConfigCache(stamp=yaml_stamp, config=config))
+        round_trips = _config_cache_decoder.decode(body).config == config
+    except (TypeError, msgspec.MsgspecError):
+        round_trips = False
+    if not round_trips:
+        # Values JSON can't round-trip (dates, sets, non-string keys): don't cache a different config
+        logger.debug(f"Config for {cache_path} does not round-trip through JSON, not caching it")
+        return
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, prefix=cache_path.name, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(body)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError as e:
+        # Read-only config directory: just parse the YAML on every start
+        logger.debug(f"Could not write config cache {cache_path}: {e}")
+
 
 def load_yaml_config(path: Path | str) -> dict[str, Any]:
-    """Load configuration from YAML file."""
-    path = Path(path)
-    if not path.exists():
+    """Load configuration from YAML file.
+
+    The parsed result is cached in a JSON sidecar (<name>.yaml.json) and
+    reused only while the YAML's mtime and size match the ones stat'ed before
+    it was parsed (an edit during the parse, or a restored older file, both
+    invalidate it).
+    """
+    if not isinstance(path, Path):
+        path = Path(path)
+
+    try:
+        yaml_stat = path.stat()
+    except FileNotFoundError:
         logger.warning(f"Config file not found: {path}, using defaults")
         return {}
 
+    yaml_stamp = (yaml_stat.st_mtime_ns, yaml_stat.st_size)
+    cache_path = path.with_suffix(path.suffix + ".json")
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            config = yaml.safe_load(f)
-            logger.info(f"Loaded config from {path}")
-            return config or {}
+        cached = _read_config_cache(cache_path, yaml_stamp)
+        if cached is not None:
+            logger.info(f"Loaded config from {path} (cached)")
+            return cached
+
+        # Feed raw bytes: the libyaml reader detects and decodes UTF-8 itself
+        with open(path, "rb") as f:
+            config = yaml.load(f, Loader=SafeLoader) or {}
+        logger.info(f"Loaded config from {path}")
     except Exception as e:
         logger.error(f"Failed to load config from {path}: {e}")
         return {}
 
+    _write_config_cache(cache_path, yaml_stamp, config)
+    return config
+
+
+def _freeze_types(types: Any) -> Mapping[str, Any] | tuple[str, ...]:
+    """Freeze a type list or {type: description} mapping, interning type names."""
+    if isinstance(types, dict):
+        return MappingProxyType({sys.intern(str(name)): desc for name, desc in types.items()})
+    return tuple(sys.intern(str(name)) for name in types or ())
+
+
+class DomainTables(NamedTuple):
+    """Per-domain tables built from the YAML `domains` section."""
+
+    presets: Mapping[str, Mapping[str, Any]]
+    schema: dict[str, dict[str, str]]
+    names: tuple[str, ...]
 
-def build_domain_presets(yaml_config: dict[str, Any]) -> dict[str, dict[str, Any]]:
-    """Build DOMAIN_PRESETS from YAML config.
+
+def build_domain_tables(yaml_config: dict[str, Any]) -> DomainTables:
+    """Build DOMAIN_PRESETS, CLASSIFICATION_SCHEMA and domain names in one pass.
 
     Each domain can have:
     - enabled: bool (default True) - whether to run extraction for this domain
@@ -84,32 +241,44 @@ def build_domain_presets(yaml_config: dict[str, Any]) -> dict[str, dict[str, Any
     """
     domains = yaml_config.get("domains", {})
     presets = {}
-
-    for domain_name, domain_config in domains.items():
-        if isinstance(domain_config, dict):
-            presets[domain_name] = {
-                "enabled": domain_config.get("enabled", True),  # Default to enabled
-                "entity_types": domain_config.get("entity_types", {}),
-                "relation_types": domain_config.get("relation_types", {}),
-            }
-
-    return presets
-
-
-def build_classification_schema(yaml_config: dict[str, Any]) -> dict[str, dict[str, str]]:
-    """Build CLASSIFICATION_SCHEMA from YAML config (using domain descriptions)."""
-    domains = yaml_config.get("domains", {})
     schema = {"domains": {}}
 
     for domain_name, domain_config in domains.items():
-        if isinstance(domain_config, dict):
-            description = domain_config.get("description", f"Content related to {domain_name}")
-            schema["domains"][domain_name] = description
-
-    return schema
-
-
-def get_defaults_from_yaml(yaml_config: dict[str, Any]) -> tuple[dict[str, str] | list[str], dict[str, str]]:
+        if not isinstance(domain_config, dict):
+            continue
+        domain_name = sys.intern(str(domain_name))
+        # Presets are read-only: callers must not mutate shared config
+        presets[domain_name] = MappingProxyType({
+            "enabled": domain_config.get("enabled", True),  # Default to enabled
+            "entity_types": _freeze_types(domain_config.get("entity_types", {})),
+            "relation_types": _freeze_types(domain_config.get("relation_types", {})),
+        })
+        # Domain descriptions are used for classification
+        schema["domains"][domain_name] = domain_config.get(
+            "description", f"Content related to {domain_name}"
+        )
+
+    return DomainTables(presets=MappingProxyType(presets), schema=schema, names=tuple(presets))
+
+
+# Fallback defaults when the YAML has no `defaults` section (read-only, shared)
+_DEFAULT_ENTITY_TYPES: Mapping[str, str] = MappingProxyType({
+    "person": "A human individual mentioned by their full name",
+    "organization": "A company, institution, or named group",
+    "location": "A geographical place, city, or country",
+    "technology": "A named software, framework, or tool",
+    "product": "A commercial product with a specific name",
+    "date": "A specific date or time period"
+})
+_DEFAULT_RELATION_TYPES: Mapping[str, str] = MappingProxyType({
+    "works_for": "person works for organization",
+    "located_in": "entity is located in location",
+    "created_by": "product/technology created by person/organization",
+    "uses": "organization/person uses technology"
+})
+
+
+def get_defaults_from_yaml(yaml_config: dict[str, Any]) -> tuple[Mapping[str, str] | list[str], Mapping[str, str]]:
     """Get default entity types and relation types from YAML.
 
     Entity types can be either:
@@ -119,21 +288,10 @@ def get_defaults_from_yaml(yaml_config: dict[str, Any]) -> tuple[dict[str, str]
     Returns the format as-is to preserve descriptions for GLiNER2.
     """
     defaults = yaml_config.get("defaults", {})
-    entity_types = defaults.get("entity_types", {
-        "person": "A human individual mentioned by their full name",
-        "organization": "A company, institution, or named group",
-        "location": "A geographical place, city, or country",
-        "technology": "A named software, framework, or tool",
-        "product": "A commercial product with a specific name",
-        "date": "A specific date or time period"
-    })
-    relation_types = defaults.get("relation_types", {
-        "works_for": "person works for organization",
-        "located_in": "entity is located in location",
-        "created_by": "product/technology created by person/organization",
-        "uses": "organization/person uses technology"
-    })
-    return entity_types, relation_types
+    return (
+        defaults.get("entity_types", _DEFAULT_ENTITY_TYPES),
+        defaults.get("relation_types", _DEFAULT_RELATION_TYPES),
+    )
 
 
 def get_skip_embedding_types(yaml_config: dict[str, Any]) -> list[str]:
@@ -146,58 +304,117 @@ def get_skip_embedding_types(yaml_config: dict[str, Any]) -> list[str]:
     ])
 
 
-# Initialize settings
-settings = Settings()
-
-# Load YAML configuration
-_yaml_config = load_yaml_config(settings.config_path)
+def build_all_domains_schema(
+    presets: Mapping[str, Mapping[str, Any]],
+    default_entity_types: Mapping[str, str] | list[str],
+    default_relation_types: Mapping[str, str],
+) -> tuple[tuple[str, ...], Mapping[str, str]]:
+    """Merge the types of every domain preset and the defaults (used by /extract/all)."""
+    entity_types: set[str] = set()
+    relation_types: dict[str, str] = {}
+    for preset in presets.values():
+        entity_types.update(preset["entity_types"])
+        relation_types.update(preset["relation_types"])
+    entity_types.update(default_entity_types or ())
+    relation_types.update(default_relation_types or {})
+    return tuple(sorted(entity_types)), MappingProxyType(relation_types)
+
+
+@dataclass(frozen=True)
+class ConfigState:
+    """Configuration derived from the YAML file."""
+
+    yaml_config: dict[str, Any]
+    domain_presets: Mapping[str, Mapping[str, Any]]
+    classification_schema: dict[str, dict[str, str]]
+    domain_names: tuple[str, ...]
+    skip_embedding_types: list[str]
+    default_entity_types: Mapping[str, str] | list[str]
+    default_relation_types: Mapping[str, str]
+    # Union of all domains + defaults, built once instead of per /extract/all call
+    all_entity_types: tuple[str, ...]
+    all_relation_types: Mapping[str, str]
+
+
+@functools.lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Get the service settings (env parsing and validation run once)."""
+    return Settings()
+
+
+def _bootstrap() -> ConfigState:
+    """Load the YAML configuration once and build every derived table from it."""
+    settings = get_settings()
+    yaml_config = load_yaml_config(settings.config_path)
+
+    # Defaults from YAML unless overridden via env
+    default_entity_types, default_relation_types = get_defaults_from_yaml(yaml_config)
+    if settings.default_entity_types is not None:
+        default_entity_types = settings.default_entity_types
+    if settings.default_relation_types is not None:
+        default_relation_types = settings.default_relation_types
+
+    domain_tables = build_domain_tables(yaml_config)
+    skip_embedding_types = get_skip_embedding_types(yaml_config)
+    all_entity_types, all_relation_types = build_all_domains_schema(
+        domain_tables.presets, default_entity_types, default_relation_types
+    )
+    state = ConfigState(
+        yaml_config=yaml_config,
+        domain_presets=domain_tables.presets,
+        classification_schema=domain_tables.schema,
+        domain_names=domain_tables.names,
+        skip_embedding_types=skip_embedding_types,
+        default_entity_types=default_entity_types,
+        default_relation_types=default_relation_types,
+        all_entity_types=all_entity_types,
+        all_relation_types=all_relation_types,
+    )
 
-# Build domain presets from YAML
-DOMAIN_PRESETS = build_domain_presets(_yaml_config)
+    logger.info(f"Loaded {len(state.domain_names)} domain presets: {list(state.domain_names)}")
+    logger.info(f"Default entity types: {state.default_entity_types}")
+    return state
 
-# Build classification schema from YAML (domain descriptions)
-CLASSIFICATION_SCHEMA = build_classification_schema(_yaml_config)
 
-# Load skip embedding types from YAML (single source of truth)
-SKIP_EMBEDDING_TYPES = get_skip_embedding_types(_yaml_config)
+@functools.lru_cache(maxsize=1)
+def _get_state() -> ConfigState:
+    """Get the config state, bootstrapping it on first use."""
+    return _bootstrap()
 
-# Set defaults from YAML if not overridden via env
-_default_entity_types, _default_relation_types = get_defaults_from_yaml(_yaml_config)
 
-if settings.default_entity_types is None:
-    settings.default_entity_types = _default_entity_types
+# Module attributes resolved lazily from the config state (PEP 562)
+_LAZY_ATTRIBUTES = {
+    "DOMAIN_PRESETS": "domain_presets",
+    "CLASSIFICATION_SCHEMA": "classification_schema",
+    "SKIP_EMBEDDING_TYPES": "skip_embedding_types",
+    "DEFAULT_ENTITY_TYPES": "default_entity_types",
+    "DEFAULT_RELATION_TYPES": "default_relation_types",
+    "ALL_ENTITY_TYPES": "all_entity_types",
+    "ALL_RELATION_TYPES": "all_relation_types",
+}
 
-if settings.default_relation_types is None:
-    settings.default_relation_types = _default_relation_types
 
-# Log loaded configuration
-logger.info(f"Loaded {len(DOMAIN_PRESETS)} domain presets: {list(DOMAIN_PRESETS.keys())}")
-logger.info(f"Default entity types: {settings.default_entity_types}")
+def __getattr__(name: str) -> Any:
+    """Resolve settings and YAML-derived configuration on first access."""
+    if name == "settings":
+        return get_settings()
+    try:
+        field_name = _LAZY_ATTRIBUTES[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    return getattr(_get_state(), field_name)
 
 
 def reload_config() -> None:
     """Reload configuration from YAML file (useful for hot-reload)."""
-    global DOMAIN_PRESETS, CLASSIFICATION_SCHEMA, SKIP_EMBEDDING_TYPES, _yaml_config
-
-    _yaml_config = load_yaml_config(settings.config_path)
-    DOMAIN_PRESETS = build_domain_presets(_yaml_config)
-    CLASSIFICATION_SCHEMA = build_classification_schema(_yaml_config)
-    SKIP_EMBEDDING_TYPES = get_skip_embedding_types(_yaml_config)
-
-    _default_entity_types, _default_relation_types = get_defaults_from_yaml(_yaml_config)
-    if settings.default_entity_types is None:
-        settings.default_entity_types = _default_entity_types
-    if settings.default_relation_types is None:
-        settings.default_relation_types = _default_relation_types
-
-    logger.info(f"Reloaded config: {len(DOMAIN_PRESETS)} domains, {len(SKIP_EMBEDDING_TYPES)} skip-embedding types")
+    _get_state.cache_clear()
 
 
-def get_available_domains() -> list[str]:
-    """Get list of available domain names."""
-    return list(DOMAIN_PRESETS.keys())
+def get_available_domains() -> tuple[str, ...]:
+    """Get available domain names (cached until the next config reload)."""
+    return _get_state().domain_names
 
 
-def get_domain_config(domain: str) -> dict[str, Any] | None:
+def get_domain_config(domain: str) -> Mapping[str, Any] | None:
     """Get configuration for a specific domain."""
-    return DOMAIN_PRESETS.get(domain)
+    return _get_state().domain_presets.get(domain)
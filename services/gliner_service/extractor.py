@@ -5,18 +5,245 @@ Uses schema builder for combined entity + relation extraction.
 Supports multi-label classification for domain auto-detection.
 """
 
+import contextlib
+import functools
+import hashlib
 import logging
+import math
+import re
+import threading
 import time
 from typing import Any
-from collections import defaultdict
+from collections import OrderedDict
+from collections.abc import Callable, Iterator, Mapping
+from itertools import chain
 
+import numpy as np
+import torch
 from gliner2 import GLiNER2
 
-from config import settings, DOMAIN_PRESETS, CLASSIFICATION_SCHEMA
-from models import ExtractedEntity, ExtractedRelation, ExtractionResult
+import config
+from config import settings
+from models import ExtractedEntity, ExtractedRelation, ExtractionRequest, ExtractionResult
 
 logger = logging.getLogger(__name__)
 
+# Padded length budget (in words) per batch_size slot: buckets of short texts
+# get proportionally larger slices at roughly the same padded-token cost
+BUCKET_WORD_BUDGET = 512
+# Longest/shortest text ratio allowed within one length bucket
+BUCKET_LENGTH_RATIO = 1.2
+# Hard cap on a bucket's size, as a multiple of batch_size
+BUCKET_MAX_BATCH_MULTIPLIER = 4
+
+# GLiNER2 truncates inputs past its ~384-token window: longer texts are split
+# into overlapping chunks (in characters) and the results merged back
+CHUNK_SIZE = 1500
+CHUNK_OVERLAP = 200
+
+# Half-precision settings -> torch dtype used for the encoder and autocast
+_AUTOCAST_DTYPES = {"bf16": torch.bfloat16, "fp16": torch.float16}
+
+# Keywords for the heuristic domain fallback (when GLiNER2 classification fails)
+CLASSIFICATION_KEYWORDS = {
+    "ecommerce": ["price", "product", "shop", "buy", "cart", "order", "brand",
+                  "ingredient", "shampoo", "cream", "hair", "skin", "beauty"],
+    "code": ["function", "class", "import", "def", "return", "const", "let",
+             "var", "async", "await", "export", "module", "api", "endpoint"],
+    "documentation": ["feature", "requirement", "specification", "user story",
+                      "use case", "milestone", "release", "version", "component"],
+    "legal": ["contract", "clause", "obligation", "party", "jurisdiction",
+              "agreement", "terms", "conditions", "liability", "warrant"]
+}
+# Split once: single words are looked up in the text's token set, multi-word
+# keywords ("user story") fall back to a substring test
+_SINGLE_WORD_KEYWORDS = {
+    domain: frozenset(kw for kw in kws if " " not in kw) for domain, kws in CLASSIFICATION_KEYWORDS.items()
+}
+_MULTI_WORD_KEYWORDS = {
+    domain: tuple(kw for kw in kws if " " in kw) for domain, kws in CLASSIFICATION_KEYWORDS.items()
+}
+_WORD_PATTERN = re.compile(r"\w+")
+
+# Batch sizes run once after compilation so common shapes are specialized before traffic
+PREWARM_BATCH_SIZES = (1, 8, 32)
+# Text lengths (words) warmed at PREWARM_LENGTH_BATCH_SIZE, covering typical bucket lengths
+PREWARM_TEXT_WORDS = (128, 256, 384)
+PREWARM_LENGTH_BATCH_SIZE = 8
+
+# Probe batch used to measure activation memory per word on GPU
+PROBE_BATCH_SIZE = 8
+PROBE_WORDS = 256
+
+
+def _schema_types(types: Mapping[str, str] | list[str] | tuple[str, ...]) -> dict[str, str] | list[str]:
+    """Convert read-only config types into the dict/list forms GLiNER2 accepts."""
+    if isinstance(types, (dict, list)):
+        return types
+    if isinstance(types, Mapping):
+        return dict(types)
+    return list(types)
+
+
+def _types_key(types: Mapping[str, str] | list[str] | tuple[str, ...] | None) -> tuple:
+    """
+    Hashable key for a set of entity/relation types.
+
+    Order-sensitive: labels are encoded in the given order, so a permuted
+    request must not reuse a schema built for another prompt order.
+    """
+    if not types:
+        return ()
+    if isinstance(types, Mapping):
+        return tuple(types.items())
+    return tuple(types)
+
+
+def _prompt_words(*type_groups: Mapping[str, str] | list[str] | tuple[str, ...] | None) -> int:
+    """
+    Approximate length (in words) of the label prompt GLiNER2 encodes with each text.
+
+    The model is a uni-encoder: every label (plus a marker token) is part of
+    the input sequence, so a long schema costs as much as the text itself.
+    """
+    return sum(len(label.replace("_", " ").split()) + 1 for types in type_groups if types for label in types)
+
+
+def _autocast_encoder(encoder: torch.nn.Module, dtype: torch.dtype) -> None:
+    """Run the encoder's forward under autocast and hand FP32 hidden states to the heads."""
+    forward = encoder.forward
+
+    @functools.wraps(forward)
+    def autocast_forward(*args: Any, **kwargs: Any) -> Any:
+        with torch.autocast(device_type="cuda", dtype=dtype):
+            output = forward(*args, **kwargs)
+        if isinstance(output, torch.Tensor):
+            return output.float()
+        if getattr(output, "last_hidden_state", None) is not None:
+            output.last_hidden_state = output.last_hidden_state.float()
+        return output
+
+    # Instance attribute: nn.Module.__call__ (and torch.compile) go through it
+    encoder.forward = autocast_forward
+
+
+def _entity_text(entity: Any) -> str:
+    """Extract text from entity (can be string or dict with 'text'/'name' key)."""
+    if type(entity) is dict:
+        try:
+            return entity["text"]
+        except KeyError:
+            return entity["name"] if "name" in entity else str(entity)
+    return str(entity)
+
+
+def _entity_confidence(entity: Any) -> float | None:
+    """Extract confidence from entity dict if available."""
+    if type(entity) is dict:
+        return entity["confidence"] if "confidence" in entity else entity.get("score")
+    return None
+
+
+def _chunk_text(text: str, size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP) -> list[tuple[str, int]]:
+    """Split text into (chunk, offset) pairs of ~size chars overlapping by ~overlap, cut on whitespace."""
+    if len(text) <= size:
+        return [(text, 0)]
+
+    chunks = []
+    start = 0
+    while True:
+        end = start + size
+        if end >= len(text):
+            chunks.append((text[start:], start))
+            return chunks
+        # Don't cut words: end at the last space inside the overlap window
+        cut = text.rfind(" ", end - overlap, end)
+        if cut > start:
+            end = cut
+        chunks.append((text[start:end], start))
+        # Next chunk starts on a word boundary ~overlap chars back
+        next_start = text.find(" ", end - overlap, end)
+        start = next_start + 1 if next_start != -1 else end - overlap
+
+
+# Exact type checks below: GLiNER2 returns plain dicts/lists/tuples,
+# `type(x) is T` skips the isinstance subclass walk in these hot loops
+
+def _iter_entities(
+    entity_type: str,
+    entity_list: Any,
+    include_confidence: bool,
+    include_spans: bool,
+) -> Iterator[ExtractedEntity]:
+    """Yield the entities GLiNER2 returned for one entity type."""
+    if type(entity_list) is not list:
+        return
+    for item in entity_list:
+        if type(item) is dict:
+            if include_confidence:
+                confidence = item["score"] if "score" in item else item.get("confidence")
+            else:
+                confidence = None
+            yield ExtractedEntity(
+                name=_entity_text(item),
+                type=entity_type,
+                confidence=confidence,
+                span=(item.get("start"), item.get("end")) if include_spans and "start" in item else None,
+            )
+        else:
+            yield ExtractedEntity(
+                name=str(item),
+                type=entity_type,
+                confidence=None,
+                span=None,
+            )
+
+
+def _iter_relation_rows(
+    relation_type: str,
+    relation_list: Any,
+    include_confidence: bool,
+) -> Iterator[tuple[str, str, str, float, float, float]]:
+    """
+    Yield (subject, predicate, object, subject_conf, object_conf, relation_conf)
+    rows for one relation type. Missing confidences are NaN.
+    """
+    if type(relation_list) is not list:
+        return
+    nan = math.nan
+    for item in relation_list:
+        if type(item) is tuple and len(item) >= 2:
+            # With include_confidence, subject/object can be dicts: {'text': '...', 'confidence': ...}
+            subj, obj = item[0], item[1]
+            subj_conf = obj_conf = tuple_conf = None
+            if include_confidence:
+                subj_conf = _entity_confidence(subj)
+                obj_conf = _entity_confidence(obj)
+                tuple_conf = item[2] if len(item) > 2 else None
+            yield (
+                _entity_text(subj),
+                relation_type,
+                _entity_text(obj),
+                nan if subj_conf is None else subj_conf,
+                nan if obj_conf is None else obj_conf,
+                nan if tuple_conf is None else tuple_conf,
+            )
+        elif type(item) is dict:
+            subj = item["subject"] if "subject" in item else item.get("head", "")
+            obj = item["object"] if "object" in item else item.get("tail", "")
+            confidence = None
+            if include_confidence:
+                confidence = item["score"] if "score" in item else item.get("confidence")
+            # No entity confidences: only the relation's own score counts
+            yield (
+                _entity_text(subj),
+                relation_type,
+                _entity_text(obj),
+                nan,
+                nan,
+                nan if confidence is None else confidence,
+            )
+
 
 class GLiNERExtractor:
     """
@@ -36,42 +263,219 @@ class GLiNERExtractor:
         self.model_name = model_name
         self.device = device
         self._model: GLiNER2 | None = None
+        # Half-precision autocast dtype (CUDA only, None = fp32)
+        self._autocast_dtype: torch.dtype | None = None
+        if settings.precision in _AUTOCAST_DTYPES and device.startswith("cuda"):
+            self._autocast_dtype = _AUTOCAST_DTYPES[settings.precision]
+        # Built schemas keyed by label set (LRU, see _get_schema)
+        self._schema_cache: OrderedDict[tuple, Any] = OrderedDict()
+        self._schema_lock = threading.Lock()
+        # Domain classifications keyed by (text digest, threshold) (LRU, see classify_domains)
+        self._classify_cache: OrderedDict[tuple[bytes, float], tuple[tuple[str, float], ...]] = OrderedDict()
+        self._classify_lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        # One model call at a time (see _inference_context); unload waits for it too.
+        # Reentrant: loading under the lock runs the warmup passes
+        self._inference_lock = threading.RLock()
+        # Words per padded batch that fit in GPU memory (None = not measured, no cap)
+        self._max_tokens_per_batch: int | None = None
+        # Pinned CPU copy of the weights, swapped in by unload() on CUDA (see _offload)
+        self._cpu_state: dict[str, torch.Tensor] | None = None
+        self._offloaded = False
 
     @property
     def model(self) -> GLiNER2:
-        """Lazy load the model."""
-        if self._model is None:
-            logger.info(f"Loading GLiNER2 model: {self.model_name}")
-            self._model = GLiNER2.from_pretrained(self.model_name)
-            self._model = self._model.to(self.device)
-            logger.info(f"Model loaded on {self.device}")
+        """Lazy load the model (once, even under concurrent first calls)."""
+        if self._model is None or self._offloaded:
+            # Inference lock first, as in model calls and unload (same lock order)
+            with self._inference_lock, self._load_lock:
+                if self._offloaded:
+                    self._restore()
+                elif self._model is None:
+                    logger.info(f"Loading GLiNER2 model: {self.model_name}")
+                    model = GLiNER2.from_pretrained(self.model_name)
+                    model = model.to(self.device)
+                    self._model = self._optimize_model(model)
+                    if settings.compile_model:
+                        self._prewarm()
+                    logger.info(f"Model loaded on {self.device}")
         return self._model
 
-    def unload(self) -> bool:
-        """
-        Unload the model from GPU to free VRAM.
+    def _optimize_model(self, model: GLiNER2) -> GLiNER2:
+        """Apply the inference optimizations selected in settings."""
+        if settings.num_threads:
+            torch.set_num_threads(settings.num_threads)
+
+        if self.device.startswith("cuda"):
+            # TF32 tensor cores for the FP32 matmuls (heads, fp32 encoder)
+            torch.set_float32_matmul_precision("high")
+            # Let scaled_dot_product_attention pick fused kernels. DeBERTa's
+            # disentangled attention is hand-written and does not go through
+            # SDPA, so this only helps attention layers that do
+            torch.backends.cuda.enable_flash_sdp(True)
+            torch.backends.cuda.enable_mem_efficient_sdp(True)
+
+        if settings.precision == "int8":
+            if self.device == "cpu":
+                # INT8 weights, activations quantized on the fly (no calibration needed)
+                model = torch.ao.quantization.quantize_dynamic(
+                    model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+                )
+                logger.info("Applied dynamic INT8 quantization to Linear layers")
+            else:
+                logger.warning(f"INT8 precision is only supported on CPU, running fp32 on {self.device}")
+        elif settings.precision in _AUTOCAST_DTYPES:
+            if self._autocast_dtype is not None:
+                # Only the encoder is cast and autocast: heads keep FP32 weights
+                # and inputs so that confidence scores (cls_threshold, UI) stay calibrated
+                model.encoder.to(dtype=self._autocast_dtype)
+                _autocast_encoder(model.encoder, self._autocast_dtype)
+                logger.info(f"Running encoder in {settings.precision} with autocast")
+            else:
+                logger.warning(f"{settings.precision} precision is only supported on CUDA, running fp32 on {self.device}")
 
-        Returns True if model was unloaded, False if already unloaded.
+        if settings.compile_model:
+            # Compile the encoder only: GLiNER2's batch_extract/create_schema stay plain methods
+            mode = "reduce-overhead" if self.device.startswith("cuda") else "default"
+            model.encoder = torch.compile(model.encoder, mode=mode, dynamic=True)
+            logger.info(f"Compiling encoder with torch.compile (mode={mode})")
+
+        return model
+
+    def _prewarm(self) -> None:
         """
-        if self._model is None:
-            logger.info("Model already unloaded")
-            return False
+        Run warmup passes over common batch sizes and text lengths.
 
-        logger.info("Unloading GLiNER2 model from GPU...")
+        Triggers torch.compile graph capture and kernel autotuning before the
+        first request, then sizes batches to GPU memory (see _probe_memory).
+        Falls back to the eager encoder if compilation fails.
+        """
+        model = self._model
+        schema = self._get_schema(config.DEFAULT_ENTITY_TYPES, config.DEFAULT_RELATION_TYPES)
+        start_ns = time.perf_counter_ns()
+        try:
+            for size in sorted({*PREWARM_BATCH_SIZES, settings.default_batch_size}):
+                with self._inference_context():
+                    model.batch_extract(["Warmup text for GLiNER2."] * size, schema, batch_size=size)
+            for words in PREWARM_TEXT_WORDS:
+                batch = [" ".join(["warmup"] * words)] * PREWARM_LENGTH_BATCH_SIZE
+                with self._inference_context():
+                    model.batch_extract(batch, schema, batch_size=PREWARM_LENGTH_BATCH_SIZE)
+        except Exception as e:
+            if settings.compile_model:
+                logger.warning(f"torch.compile warmup failed, falling back to eager: {e}")
+                model.encoder = getattr(model.encoder, "_orig_mod", model.encoder)
+            else:
+                logger.warning(f"Warmup failed: {e}")
+            return
+        logger.info(f"Warmup completed in {(time.perf_counter_ns() - start_ns) / 1e6:.0f}ms")
 
-        # Move model to CPU first, then delete
         try:
-            self._model = self._model.to("cpu")
+            self._probe_memory(schema, _prompt_words(config.DEFAULT_ENTITY_TYPES, config.DEFAULT_RELATION_TYPES))
         except Exception as e:
-            logger.warning(f"Failed to move model to CPU: {e}")
+            logger.warning(f"Memory probe failed, batches stay unbounded: {e}")
+
+    def _probe_memory(self, schema, prompt_words: int) -> None:
+        """
+        Estimate how many words fit in one batch on GPU.
+
+        Measures peak activation memory of a probe batch and scales it to
+        settings.max_mem_fraction of device memory. Lengths include the
+        schema's label prompt (prompt_words), as in _fit_batch.
+        """
+        if not (self.device.startswith("cuda") and torch.cuda.is_available()):
+            return
+
+        probe = [" ".join(["probe"] * PROBE_WORDS)] * PROBE_BATCH_SIZE
+        torch.cuda.synchronize(self.device)
+        baseline = torch.cuda.memory_allocated(self.device)
+        torch.cuda.reset_peak_memory_stats(self.device)
+        with self._inference_context():
+            self._model.batch_extract(probe, schema, batch_size=len(probe))
+        peak = torch.cuda.max_memory_allocated(self.device)
+
+        bytes_per_word = max(peak - baseline, 1) / (PROBE_BATCH_SIZE * (PROBE_WORDS + prompt_words))
+        total = torch.cuda.get_device_properties(self.device).total_memory
+        budget = total * settings.max_mem_fraction - baseline
+        self._max_tokens_per_batch = max(PROBE_WORDS, int(budget / bytes_per_word))
+        logger.info(f"Memory-aware batching: up to {self._max_tokens_per_batch} words per batch")
+
+    def _fit_batch(self, lengths: list[int]) -> int:
+        """Number of leading texts (word lengths, prompt included) whose padded batch fits the memory cap."""
+        cap = self._max_tokens_per_batch
+        if cap is None:
+            return len(lengths)
+        longest = 0
+        for n, length in enumerate(lengths):
+            longest = max(longest, length)
+            if (n + 1) * longest > cap:
+                return max(n, 1)
+        return len(lengths)
+
+    def _run_batch(self, batch: list[str], schema, prompt_words: int = 0, **kwargs) -> list[dict[str, Any]]:
+        """
+        Run GLiNER2 over one batch.
+
+        On CUDA OOM, frees cached memory, lowers the words-per-batch cap and
+        retries the two halves. prompt_words is the schema's label prompt
+        length, counted per text like in _fit_batch.
+        """
+        try:
+            # batch_size=len(batch) collates the batch in one go instead of
+            # spinning up a DataLoader per call
+            with self._inference_context():
+                return self.model.batch_extract(batch, schema, batch_size=len(batch), **kwargs)
+        except torch.cuda.OutOfMemoryError:
+            if len(batch) == 1:
+                raise
+            torch.cuda.empty_cache()
+            half = len(batch) // 2
+            padded_words = len(batch) * (max(len(t.split()) for t in batch) + prompt_words)
+            self._max_tokens_per_batch = min(self._max_tokens_per_batch or padded_words, padded_words // 2)
+            logger.warning(f"CUDA OOM on a batch of {len(batch)} texts, retrying in halves")
+            return (
+                self._run_batch(batch[:half], schema, prompt_words, **kwargs)
+                + self._run_batch(batch[half:], schema, prompt_words, **kwargs)
+            )
 
-        # Delete the model
-        del self._model
-        self._model = None
+    @contextlib.contextmanager
+    def _inference_context(self) -> Iterator[None]:
+        """
+        Exclusive model access for a forward pass.
+
+        Forward passes are serialized: concurrent callers (coalescer, request
+        threads) would otherwise run overlapping batches past the
+        measured memory budget, and unload() must not swap weights mid-forward.
+        """
+        with self._inference_lock:
+            yield
+
+    def unload(self) -> bool:
+        """
+        Unload the model from GPU to free VRAM.
+
+        Returns True if model was unloaded, False if already unloaded.
+        """
+        # Waits for the batch in flight, then blocks model calls until done
+        with self._inference_lock, self._load_lock:
+            if not self.is_loaded():
+                logger.info("Model already unloaded")
+                return False
+
+            logger.info("Unloading GLiNER2 model from GPU...")
+
+            if self.device.startswith("cuda"):
+                # Keep the model object (optimizations, compiled encoder) and
+                # swap its weights for CPU copies: reloading is then a
+                # host-to-device copy instead of from_pretrained
+                self._offload()
+            else:
+                # Delete the model
+                del self._model
+                self._model = None
 
         # Clear CUDA cache
         try:
-            import torch
             if torch.cuda.is_available():
                 torch.cuda.empty_cache()
                 logger.info("CUDA cache cleared")
@@ -85,9 +489,133 @@ class GLiNERExtractor:
         logger.info("Model unloaded successfully")
         return True
 
+    def _offload(self) -> None:
+        """Point the model's weights at pinned CPU tensors, releasing the GPU ones."""
+        if self._cpu_state is None:
+            # Inference never updates the weights: copied once, reused by every unload
+            copies: dict[tuple, torch.Tensor] = {}
+            cpu_state = {}
+            for key, tensor in self._model.state_dict().items():
+                # Tied weights share one copy
+                storage_key = (tensor.data_ptr(), tensor.shape, tensor.dtype)
+                if storage_key not in copies:
+                    copies[storage_key] = tensor.detach().to("cpu").pin_memory()
+                cpu_state[key] = copies[storage_key]
+            self._cpu_state = cpu_state
+        self._model.load_state_dict(self._cpu_state, assign=True)
+        self._offloaded = True
+
+    def _restore(self) -> None:
+        """Copy the offloaded weights back to the GPU (see _offload)."""
+        logger.info(f"Restoring GLiNER2 weights to {self.device}")
+        copies: dict[int, torch.Tensor] = {}
+        gpu_state = {}
+        for key, tensor in self._cpu_state.items():
+            if id(tensor) not in copies:
+                copies[id(tensor)] = tensor.to(self.device, non_blocking=True)
+            gpu_state[key] = copies[id(tensor)]
+        # Parameters get new addresses: compiled CUDA graphs re-record on first use
+        self._model.load_state_dict(gpu_state, assign=True)
+        # Non-blocking copies must land before the next batch reads them
+        torch.cuda.synchronize()
+        self._offloaded = False
+        logger.info(f"Model loaded on {self.device}")
+
     def is_loaded(self) -> bool:
         """Check if model is currently loaded."""
-        return self._model is not None
+        return self._model is not None and not self._offloaded
+
+    def _get_schema(
+        self,
+        entity_types: Mapping[str, str] | list[str],
+        relation_types: Mapping[str, str] | None = None,
+    ):
+        """
+        Get the GLiNER2 schema for a set of entity/relation types.
+
+        Domain and default vocabularies are fixed, so the same label sets
+        come back on almost every call. Built schemas are kept in a small
+        LRU instead of being rebuilt through the schema builder each time.
+        """
+        def build():
+            # Build schema using GLiNER2 schema builder
+            schema = self.model.create_schema().entities(_schema_types(entity_types))
+            # Add relations if provided
+            if relation_types:
+                schema = schema.relations(_schema_types(relation_types))
+            return schema
+
+        return self._cached_schema((_types_key(entity_types), _types_key(relation_types)), build)
+
+    def _get_classification_schema(self, labels: list[str], threshold: float, multi_label: bool = True):
+        """Get the GLiNER2 domain classification schema (cached like _get_schema)."""
+        def build():
+            return self.model.create_schema().classification(
+                "domains",
+                labels,
+                multi_label=multi_label,
+                cls_threshold=threshold
+            )
+
+        return self._cached_schema(("classification", tuple(labels), threshold, multi_label), build)
+
+    def prebuild_schemas(self) -> None:
+        """
+        Build the schemas of the configured vocabularies ahead of traffic.
+
+        Covers the defaults, the /extract request defaults, each domain
+        preset, the all-domains merge and domain classification.
+        """
+        self._get_schema(config.DEFAULT_ENTITY_TYPES, config.DEFAULT_RELATION_TYPES)
+        # Same key as the request path: extract() fills in the default relations
+        self._get_schema(ExtractionRequest.model_fields["entity_types"].default, config.DEFAULT_RELATION_TYPES)
+        for domain in config.get_available_domains():
+            self._get_schema(*self.get_preset_schema([domain]))
+        self._get_schema(*self.get_all_domains_schema())
+        self._get_classification_schema(list(config.CLASSIFICATION_SCHEMA["domains"].keys()), 0.3)
+        logger.info(f"Prebuilt {len(self._schema_cache)} schemas")
+
+    def _cached_schema(self, key: tuple, build: Callable[[], Any]):
+        """Return the schema cached under key, building and storing it on a miss (LRU)."""
+        with self._schema_lock:
+            schema = self._schema_cache.get(key)
+            if schema is not None:
+                self._schema_cache.move_to_end(key)
+                return schema
+
+        schema = build()
+
+        with self._schema_lock:
+            self._schema_cache[key] = schema
+            if len(self._schema_cache) > settings.schema_cache_size:
+                self._schema_cache.popitem(last=False)
+        return schema
+
+    @staticmethod
+    def _classification_key(text: str, threshold: float) -> tuple[bytes, float]:
+        return hashlib.blake2b(text.encode(), digest_size=16).digest(), threshold
+
+    def _cached_classification(self, key: tuple[bytes, float]) -> list[dict[str, Any]] | None:
+        """Return a fresh copy of the domains cached under key, or None on a miss."""
+        with self._classify_lock:
+            detected = self._classify_cache.get(key)
+            if detected is None:
+                return None
+            self._classify_cache.move_to_end(key)
+        return [{"label": label, "confidence": confidence} for label, confidence in detected]
+
+    def _store_classification(self, key: tuple[bytes, float], detected: list[dict[str, Any]]) -> None:
+        if settings.classify_cache_size == 0:
+            return
+        with self._classify_lock:
+            self._classify_cache[key] = tuple((d["label"], d["confidence"]) for d in detected)
+            if len(self._classify_cache) > settings.classify_cache_size:
+                self._classify_cache.popitem(last=False)
+
+    def clear_classification_cache(self) -> None:
+        """Drop cached classifications (the domain labels changed, see /config/reload)."""
+        with self._classify_lock:
+            self._classify_cache.clear()
 
     def extract(
         self,
@@ -113,26 +641,20 @@ class GLiNERExtractor:
         Returns:
             ExtractionResult with entities and relations
         """
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
 
         # Use defaults if not provided
         if entity_types is None:
-            entity_types = settings.default_entity_types
+            entity_types = config.DEFAULT_ENTITY_TYPES
         if relation_types is None:
-            relation_types = settings.default_relation_types
-
-        # Build schema using GLiNER2 schema builder
-        schema_builder = self.model.create_schema().entities(entity_types)
+            relation_types = config.DEFAULT_RELATION_TYPES
 
-        # Add relations if provided
-        if relation_types:
-            schema_builder = schema_builder.relations(relation_types)
-
-        schema = schema_builder
+        schema = self._get_schema(entity_types, relation_types)
 
         # Extract with GLiNER2
         try:
-            raw_result = self.model.extract(text, schema, include_confidence=include_confidence)
+            with self._inference_context():
+                raw_result = self.model.extract(text, schema, include_confidence=include_confidence)
             logger.debug(f"GLiNER2 raw_result: {raw_result}")
         except Exception as e:
             logger.error(f"Extraction failed: {e}")
@@ -142,7 +664,7 @@ class GLiNERExtractor:
         result = self._parse_extraction_result(raw_result, include_confidence, include_spans)
 
         # Override with total time (extraction + parsing)
-        result.processing_time_ms = (time.time() - start_time) * 1000
+        result.processing_time_ms = (time.perf_counter_ns() - start_ns) / 1e6
         return result
 
     def classify_domains(
@@ -160,39 +682,24 @@ class GLiNERExtractor:
         Returns:
             List of detected domains with confidence
         """
-        domain_labels = list(CLASSIFICATION_SCHEMA["domains"].keys())
-        domain_descriptions = CLASSIFICATION_SCHEMA["domains"]
+        # Repeated texts (retries, RAG reruns) skip the forward pass
+        key = self._classification_key(text, threshold)
+        cached = self._cached_classification(key)
+        if cached is not None:
+            return cached
+
+        domain_labels = list(config.CLASSIFICATION_SCHEMA["domains"].keys())
 
         try:
             # Use GLiNER2 native multi-label classification
-            schema = self.model.create_schema().classification(
-                "domains",
-                domain_labels,
-                multi_label=True,
-                cls_threshold=threshold
-            )
-
-            result = self.model.extract(text, schema)
-
-            # Parse classification results
-            # GLiNER2 returns: {'domains': [{'label': 'tech', 'confidence': 0.92}, ...]}
-            detected = []
-            domains_result = result.get("domains", [])
+            schema = self._get_classification_schema(domain_labels, threshold)
 
-            if isinstance(domains_result, list):
-                for item in domains_result:
-                    if isinstance(item, dict):
-                        detected.append({
-                            "label": item.get("label"),
-                            "confidence": item.get("confidence", item.get("score", 0.0)),
-                        })
-                    elif isinstance(item, str):
-                        detected.append({
-                            "label": item,
-                            "confidence": threshold,  # Default confidence
-                        })
+            with self._inference_context():
+                result = self.model.extract(text, schema)
 
-            return sorted(detected, key=lambda x: -x.get("confidence", 0))
+            detected = self._parse_classification(result, threshold)
+            self._store_classification(key, detected)
+            return detected
 
         except Exception as e:
             logger.warning(f"Domain classification failed: {e}, falling back to heuristic")
@@ -218,53 +725,66 @@ class GLiNERExtractor:
         if not texts:
             return []
 
-        domain_labels = list(CLASSIFICATION_SCHEMA["domains"].keys())
+        # Only texts missing from the classification cache go to the model
+        keys = [self._classification_key(text, threshold) for text in texts]
+        all_classifications = [self._cached_classification(key) for key in keys]
+        misses = [i for i, detected in enumerate(all_classifications) if detected is None]
+        if not misses:
+            return all_classifications
+        miss_texts = [texts[i] for i in misses]
+
+        domain_labels = list(config.CLASSIFICATION_SCHEMA["domains"].keys())
 
         try:
             # Use GLiNER2 native multi-label classification
-            schema = self.model.create_schema().classification(
-                "domains",
-                domain_labels,
-                multi_label=True,
-                cls_threshold=threshold
-            )
+            schema = self._get_classification_schema(domain_labels, threshold)
 
             # Process in batches to avoid OOM with large document sets
-            all_batch_results = []
-            for i in range(0, len(texts), batch_size):
-                batch = texts[i:i + batch_size]
-                batch_results = self.model.batch_extract(batch, schema)
-                all_batch_results.extend(batch_results)
-
-            batch_results = all_batch_results
+            batch_results = []
+            prompt_words = _prompt_words(domain_labels)
+            lengths = [len(t.split()) + prompt_words for t in miss_texts]
+            i = 0
+            while i < len(miss_texts):
+                end = i + self._fit_batch(lengths[i:i + batch_size])
+                batch_results.extend(self._run_batch(miss_texts[i:end], schema, prompt_words))
+                i = end
 
             # Parse classification results for each text
-            all_classifications = []
-            for result in batch_results:
-                detected = []
-                domains_result = result.get("domains", [])
-
-                if isinstance(domains_result, list):
-                    for item in domains_result:
-                        if isinstance(item, dict):
-                            detected.append({
-                                "label": item.get("label"),
-                                "confidence": item.get("confidence", item.get("score", 0.0)),
-                            })
-                        elif isinstance(item, str):
-                            detected.append({
-                                "label": item,
-                                "confidence": threshold,
-                            })
-
-                all_classifications.append(sorted(detected, key=lambda x: -x.get("confidence", 0)))
+            for i, result in zip(misses, batch_results):
+                detected = self._parse_classification(result, threshold)
+                self._store_classification(keys[i], detected)
+                all_classifications[i] = detected
 
             return all_classifications
 
         except Exception as e:
             logger.warning(f"Batch domain classification failed: {e}, falling back to sequential")
             # Fallback to sequential classification
-            return [self.classify_domains(text, threshold) for text in texts]
+            for i in misses:
+                all_classifications[i] = self.classify_domains(texts[i], threshold)
+            return all_classifications
+
+    @staticmethod
+    def _parse_classification(result: dict[str, Any], threshold: float) -> list[dict[str, Any]]:
+        """Parse a GLiNER2 classification result into domains sorted by confidence."""
+        # GLiNER2 returns: {'domains': [{'label': 'tech', 'confidence': 0.92}, ...]}
+        detected = []
+        domains_result = result.get("domains", [])
+
+        if isinstance(domains_result, list):
+            for item in domains_result:
+                if isinstance(item, dict):
+                    detected.append({
+                        "label": item.get("label"),
+                        "confidence": item.get("confidence", item.get("score", 0.0)),
+                    })
+                elif isinstance(item, str):
+                    detected.append({
+                        "label": item,
+                        "confidence": threshold,  # Default confidence
+                    })
+
+        return sorted(detected, key=lambda x: -x.get("confidence", 0))
 
     def _classify_domains_heuristic(
         self,
@@ -276,22 +796,15 @@ class GLiNERExtractor:
 
         Uses keyword matching when GLiNER2 classification is unavailable.
         """
-        CLASSIFICATION_KEYWORDS = {
-            "ecommerce": ["price", "product", "shop", "buy", "cart", "order", "brand",
-                         "ingredient", "shampoo", "cream", "hair", "skin", "beauty"],
-            "code": ["function", "class", "import", "def", "return", "const", "let",
-                    "var", "async", "await", "export", "module", "api", "endpoint"],
-            "documentation": ["feature", "requirement", "specification", "user story",
-                             "use case", "milestone", "release", "version", "component"],
-            "legal": ["contract", "clause", "obligation", "party", "jurisdiction",
-                     "agreement", "terms", "conditions", "liability", "warrant"]
-        }
-
         text_lower = text.lower()
+        tokens = set(_WORD_PATTERN.findall(text_lower))
+        # Plural forms count for their keyword ("contracts" -> "contract")
+        tokens.update([t[:-1] for t in tokens if t.endswith("s")])
         detected = []
 
         for domain, keywords in CLASSIFICATION_KEYWORDS.items():
-            hits = sum(1 for kw in keywords if kw in text_lower)
+            hits = len(_SINGLE_WORD_KEYWORDS[domain] & tokens)
+            hits += sum(1 for kw in _MULTI_WORD_KEYWORDS[domain] if kw in text_lower)
             score = hits / len(keywords) if keywords else 0
 
             if score > threshold:
@@ -316,12 +829,13 @@ class GLiNERExtractor:
         entity_types: dict[str, str] = {}
         relation_types: dict[str, str] = {}
 
+        domain_presets = config.DOMAIN_PRESETS
         for domain in domains:
-            if domain in DOMAIN_PRESETS:
-                preset = DOMAIN_PRESETS[domain]
+            if domain in domain_presets:
+                preset = domain_presets[domain]
                 preset_entities = preset["entity_types"]
-                # Handle both dict (with descriptions) and list (legacy) formats
-                if isinstance(preset_entities, dict):
+                # Handle both mapping (with descriptions) and list (legacy) formats
+                if isinstance(preset_entities, Mapping):
                     entity_types.update(preset_entities)
                 else:
                     # Legacy list format - convert to dict without descriptions
@@ -332,19 +846,19 @@ class GLiNERExtractor:
 
         # Add defaults if no domains matched
         if not entity_types:
-            default_entities = settings.default_entity_types
-            if isinstance(default_entities, dict):
-                entity_types = default_entities.copy()
+            default_entities = config.DEFAULT_ENTITY_TYPES
+            if isinstance(default_entities, Mapping):
+                entity_types = dict(default_entities)
             else:
                 entity_types = {et: "" for et in default_entities}
-            relation_types = settings.default_relation_types
+            relation_types = config.DEFAULT_RELATION_TYPES
 
         # Return dict if we have descriptions, otherwise list for backward compat
         if all(desc == "" for desc in entity_types.values()):
             return list(entity_types.keys()), relation_types
         return entity_types, relation_types
 
-    def batch_extract(
+    def iter_batch_extract(
         self,
         texts: list[str],
         entity_types: list[str] | dict[str, str] | None = None,
@@ -352,9 +866,12 @@ class GLiNERExtractor:
         batch_size: int = 32,
         include_confidence: bool = True,
         include_spans: bool = True,
-    ) -> list[ExtractionResult]:
+    ) -> Iterator[tuple[int, ExtractionResult]]:
         """
-        Batch extract entities and relations from multiple texts.
+        Batch extract entities and relations, yielding results as buckets complete.
+
+        Texts are processed in length buckets, so results arrive grouped by
+        bucket rather than in input order; each is paired with its index.
 
         Args:
             texts: List of texts to extract from
@@ -366,58 +883,191 @@ class GLiNERExtractor:
             include_confidence: Include confidence scores
             include_spans: Include character spans
 
-        Returns:
-            List of ExtractionResult, one per text
+        Yields:
+            (index, ExtractionResult) for each text, index into ``texts``
         """
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
 
         # Use defaults if not provided
         if entity_types is None:
-            entity_types = settings.default_entity_types
+            entity_types = config.DEFAULT_ENTITY_TYPES
         if relation_types is None:
-            relation_types = settings.default_relation_types
-
-        # Build schema once for the batch
-        schema_builder = self.model.create_schema().entities(entity_types)
-        if relation_types:
-            schema_builder = schema_builder.relations(relation_types)
-        schema = schema_builder
-
-        results = []
-
-        # Process in batches
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
-
+            relation_types = config.DEFAULT_RELATION_TYPES
+
+        schema = self._get_schema(entity_types, relation_types)
+
+        # Process in length buckets: sorting by length means each slice pads to
+        # texts of similar size instead of the longest text in input order.
+        # Lengths count the label prompt encoded alongside every text
+        prompt_words = _prompt_words(entity_types, relation_types)
+        lengths = [len(t.split()) + prompt_words for t in texts]
+        order = sorted(range(len(texts)), key=lengths.__getitem__)
+        token_budget = batch_size * BUCKET_WORD_BUDGET
+        max_size = batch_size * BUCKET_MAX_BATCH_MULTIPLIER
+
+        slices: list[list[int]] = []
+        start = 0
+        while start < len(order):
+            # Close the bucket early once lengths drift past BUCKET_LENGTH_RATIO x its
+            # shortest text (keeping at least half a batch), and grow short-text
+            # buckets past batch_size while the padded size stays within budget,
+            # up to BUCKET_MAX_BATCH_MULTIPLIER x batch_size
+            bucket_limit = BUCKET_LENGTH_RATIO * max(lengths[order[start]], 1)
+            min_size = max(batch_size // 2, 1)
+            end = start + 1
+            while end < len(order):
+                size, length = end - start + 1, lengths[order[end]]
+                if size > max_size or (size > batch_size and size * length > token_budget):
+                    break
+                if length > bucket_limit and end - start >= min_size:
+                    break
+                end += 1
+            # Then shrink to what fits in GPU memory (no-op until measured)
+            end = start + self._fit_batch([lengths[i] for i in order[start:end]])
+            slices.append(order[start:end])
+            start = end
+
+        for indices in slices:
             try:
-                # Use GLiNER2 batch extraction
-                batch_results = self.model.batch_extract(batch, schema, include_confidence=include_confidence)
-
-                for raw_result in batch_results:
-                    # Parse each result
-                    result = self._parse_extraction_result(
-                        raw_result,
-                        include_confidence,
-                        include_spans
-                    )
-                    results.append(result)
+                # Parse the whole slice before yielding, so a parse failure
+                # falls back without having emitted part of the bucket
+                raw_results = self._run_batch(
+                    [texts[i] for i in indices], schema, prompt_words, include_confidence=include_confidence
+                )
+                parsed = [
+                    self._parse_extraction_result(raw_result, include_confidence, include_spans)
+                    for raw_result in raw_results
+                ]
 
             except Exception as e:
                 logger.warning(f"Batch extraction failed, falling back to sequential: {e}")
                 # Fallback to sequential extraction
-                for text in batch:
-                    result = self.extract(
-                        text,
+                parsed = [
+                    self.extract(
+                        texts[i],
                         entity_types=entity_types,
                         relation_types=relation_types,
                         include_confidence=include_confidence,
                         include_spans=include_spans,
                     )
-                    results.append(result)
+                    for i in indices
+                ]
 
-        total_time = (time.time() - start_time) * 1000
+            yield from zip(indices, parsed)
+
+        total_time = (time.perf_counter_ns() - start_ns) / 1e6
         logger.debug(f"Batch extracted {len(texts)} texts in {total_time:.0f}ms")
 
+    def batch_extract(
+        self,
+        texts: list[str],
+        entity_types: list[str] | dict[str, str] | None = None,
+        relation_types: dict[str, str] | None = None,
+        batch_size: int = 32,
+        include_confidence: bool = True,
+        include_spans: bool = True,
+    ) -> list[ExtractionResult]:
+        """
+        Batch extract entities and relations from multiple texts.
+
+        Args:
+            texts: List of texts to extract from
+            entity_types: Entity types to extract. Can be:
+                - list[str]: ["person", "organization"] (legacy)
+                - dict[str, str]: {"person": "A human individual..."} (with descriptions)
+            relation_types: Relation types with descriptions
+            batch_size: Processing batch size
+            include_confidence: Include confidence scores
+            include_spans: Include character spans
+
+        Returns:
+            List of ExtractionResult, one per text
+        """
+        results: list[ExtractionResult | None] = [None] * len(texts)
+        for i, result in self.iter_batch_extract(
+            texts,
+            entity_types=entity_types,
+            relation_types=relation_types,
+            batch_size=batch_size,
+            include_confidence=include_confidence,
+            include_spans=include_spans,
+        ):
+            results[i] = result
+        return results
+
+    def batch_extract_chunked(
+        self,
+        texts: list[str],
+        entity_types: list[str] | dict[str, str] | None = None,
+        relation_types: dict[str, str] | None = None,
+        batch_size: int = 32,
+        include_confidence: bool = True,
+        include_spans: bool = True,
+    ) -> list[ExtractionResult]:
+        """
+        Batch extract, splitting texts longer than CHUNK_SIZE chars into overlapping chunks.
+
+        All chunks of all texts go through one batch_extract call. Chunk results
+        are merged back per text: spans are shifted by the chunk offset, and
+        entities/relations emitted twice by overlapping chunks are dropped.
+        Each text reports the time of the whole call (its chunks share the batch).
+
+        Returns:
+            List of ExtractionResult, one per text
+        """
+        if all(len(text) <= CHUNK_SIZE for text in texts):
+            return self.batch_extract(
+                texts,
+                entity_types=entity_types,
+                relation_types=relation_types,
+                batch_size=batch_size,
+                include_confidence=include_confidence,
+                include_spans=include_spans,
+            )
+
+        start_ns = time.perf_counter_ns()
+
+        # Flatten chunks of all texts into one batch
+        chunk_texts: list[str] = []
+        chunk_owners: list[tuple[int, int]] = []  # (text index, char offset)
+        for i, text in enumerate(texts):
+            for chunk, offset in _chunk_text(text):
+                chunk_texts.append(chunk)
+                chunk_owners.append((i, offset))
+
+        chunk_results = self.batch_extract(
+            chunk_texts,
+            entity_types=entity_types,
+            relation_types=relation_types,
+            batch_size=batch_size,
+            include_confidence=include_confidence,
+            include_spans=include_spans,
+        )
+
+        # Regroup by text, in chunk order
+        results = [ExtractionResult(entities=[], relations=[], processing_time_ms=0.0) for _ in texts]
+        seen_entities: list[set[tuple]] = [set() for _ in texts]
+        seen_relations: list[set[tuple]] = [set() for _ in texts]
+        for (i, offset), chunk_result in zip(chunk_owners, chunk_results):
+            result = results[i]
+            for entity in chunk_result.entities:
+                if entity.span is not None and offset:
+                    entity.span = (entity.span[0] + offset, entity.span[1] + offset)
+                key = (entity.name, entity.type, entity.span)
+                if key not in seen_entities[i]:
+                    seen_entities[i].add(key)
+                    result.entities.append(entity)
+            for relation in chunk_result.relations:
+                key = (relation.subject, relation.predicate, relation.object)
+                if key not in seen_relations[i]:
+                    seen_relations[i].add(key)
+                    result.relations.append(relation)
+
+        total_time = (time.perf_counter_ns() - start_ns) / 1e6
+        for result in results:
+            result.processing_time_ms = total_time
+
+        logger.debug(f"Chunked {len(texts)} texts into {len(chunk_texts)} chunks")
         return results
 
     def _parse_extraction_result(
@@ -427,130 +1077,73 @@ class GLiNERExtractor:
         include_spans: bool = True,
     ) -> ExtractionResult:
         """Parse raw GLiNER2 result into ExtractionResult."""
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
 
         # Parse entities
-        entities = []
-        entities_dict = raw_result.get("entities", {})
-
-        for entity_type, entity_list in entities_dict.items():
-            if isinstance(entity_list, list):
-                for item in entity_list:
-                    if isinstance(item, dict):
-                        entity = ExtractedEntity(
-                            name=item.get("text", item.get("name", str(item))),
-                            type=entity_type,
-                            confidence=item.get("score", item.get("confidence")) if include_confidence else None,
-                            span=(item.get("start"), item.get("end")) if include_spans and "start" in item else None,
-                        )
-                    else:
-                        entity = ExtractedEntity(
-                            name=str(item),
-                            type=entity_type,
-                            confidence=None,
-                            span=None,
-                        )
-                    entities.append(entity)
-
-        # Parse relations
-        # With include_confidence=True, subject/object can be dicts: {'text': '...', 'confidence': ...}
-        relations = []
-        relations_dict = raw_result.get("relation_extraction", {})
-
-        def extract_entity_text(entity) -> str:
-            """Extract text from entity (can be string or dict with 'text' key)."""
-            if isinstance(entity, dict):
-                return entity.get("text", entity.get("name", str(entity)))
-            return str(entity)
-
-        def extract_entity_confidence(entity) -> float | None:
-            """Extract confidence from entity dict if available."""
-            if isinstance(entity, dict):
-                return entity.get("confidence", entity.get("score"))
-            return None
-
-        for relation_type, relation_list in relations_dict.items():
-            if isinstance(relation_list, list):
-                for item in relation_list:
-                    if isinstance(item, tuple) and len(item) >= 2:
-                        # With include_confidence, tuple items can be dicts
-                        subj_text = extract_entity_text(item[0])
-                        obj_text = extract_entity_text(item[1])
-                        # Get confidence from entities or tuple[2] if available
-                        rel_confidence = None
-                        if include_confidence:
-                            subj_conf = extract_entity_confidence(item[0])
-                            obj_conf = extract_entity_confidence(item[1])
-                            if len(item) > 2 and item[2] is not None:
-                                rel_confidence = item[2]
-                            elif subj_conf is not None and obj_conf is not None:
-                                rel_confidence = (subj_conf + obj_conf) / 2
-                        relation = ExtractedRelation(
-                            subject=subj_text,
-                            predicate=relation_type,
-                            object=obj_text,
-                            confidence=rel_confidence,
-                        )
-                        relations.append(relation)
-                    elif isinstance(item, dict):
-                        relation = ExtractedRelation(
-                            subject=extract_entity_text(item.get("subject", item.get("head", ""))),
-                            predicate=relation_type,
-                            object=extract_entity_text(item.get("object", item.get("tail", ""))),
-                            confidence=item.get("score", item.get("confidence")) if include_confidence else None,
-                        )
-                        relations.append(relation)
-
-        processing_time = (time.time() - start_time) * 1000
+        entities = list(chain.from_iterable(
+            _iter_entities(entity_type, entity_list, include_confidence, include_spans)
+            for entity_type, entity_list in raw_result.get("entities", {}).items()
+        ))
+
+        # Parse relations: rows first, confidences are resolved in one vectorized pass
+        rows = list(chain.from_iterable(
+            _iter_relation_rows(relation_type, relation_list, include_confidence)
+            for relation_type, relation_list in raw_result.get("relation_extraction", {}).items()
+        ))
+
+        if include_confidence and rows:
+            _, _, _, subj_confs, obj_confs, item_confs = zip(*rows)
+            # Relation score (tuple[2]) if available, else mean of subject/object
+            # confidences (NaN unless both are known)
+            pair_mean = np.column_stack((subj_confs, obj_confs)).mean(axis=1)
+            item_arr = np.asarray(item_confs, dtype=np.float64)
+            merged = np.where(np.isnan(item_arr), pair_mean, item_arr).tolist()
+            confidences = [None if c != c else c for c in merged]
+        else:
+            confidences = [None] * len(rows)
+
+        relations = [
+            ExtractedRelation(subject=row[0], predicate=row[1], object=row[2], confidence=confidence)
+            for row, confidence in zip(rows, confidences)
+        ]
+
+        processing_time = (time.perf_counter_ns() - start_ns) / 1e6
         return ExtractionResult(
             entities=entities,
             relations=relations,
             processing_time_ms=processing_time,
         )
 
-    def get_all_domains_schema(self) -> tuple[list[str], dict[str, str]]:
+    def get_all_domains_schema(self) -> tuple[tuple[str, ...], Mapping[str, str]]:
         """
         Merge ALL domain presets into a single schema.
         Skips classification step entirely - faster but less precise.
-        """
-        entity_types = set()
-        relation_types = {}
-
-        for domain, preset in DOMAIN_PRESETS.items():
-            entity_types.update(preset["entity_types"])
-            relation_types.update(preset["relation_types"])
-
-        # Add defaults too
-        entity_types.update(settings.default_entity_types or [])
-        if settings.default_relation_types:
-            relation_types.update(settings.default_relation_types)
 
-        return list(entity_types), relation_types
+        The merge is built once per config load (see config.build_all_domains_schema).
+        """
+        return config.ALL_ENTITY_TYPES, config.ALL_RELATION_TYPES
 
-    def batch_extract_all_domains(
+    def iter_batch_extract_all_domains(
         self,
         texts: list[str],
         batch_size: int = 32,
         include_confidence: bool = True,
         include_spans: bool = True,
-    ) -> list[ExtractionResult]:
+    ) -> Iterator[tuple[int, ExtractionResult]]:
         """
-        Batch extract using ALL entity types from ALL domains.
-        Skips domain classification - faster but may have more noise.
+        Streaming variant of batch_extract_all_domains.
 
-        Use this when:
-        - Speed is critical
-        - Documents are mixed-domain
-        - You prefer recall over precision
+        Yields:
+            (index, ExtractionResult) as each length bucket completes
         """
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
 
         # Get merged schema from all domains
         entity_types, relation_types = self.get_all_domains_schema()
         logger.info(f"Extracting with ALL domains: {len(entity_types)} entity types, {len(relation_types)} relation types")
 
         # Single batch extraction call
-        results = self.batch_extract(
+        yield from self.iter_batch_extract(
             texts,
             entity_types=entity_types,
             relation_types=relation_types,
@@ -559,11 +1152,85 @@ class GLiNERExtractor:
             include_spans=include_spans,
         )
 
-        total_time = (time.time() - start_time) * 1000
+        total_time = (time.perf_counter_ns() - start_ns) / 1e6
         logger.info(f"All-domains batch extraction completed in {total_time:.0f}ms")
 
+    def batch_extract_all_domains(
+        self,
+        texts: list[str],
+        batch_size: int = 32,
+        include_confidence: bool = True,
+        include_spans: bool = True,
+    ) -> list[ExtractionResult]:
+        """
+        Batch extract using ALL entity types from ALL domains.
+        Skips domain classification - faster but may have more noise.
+
+        Use this when:
+        - Speed is critical
+        - Documents are mixed-domain
+        - You prefer recall over precision
+        """
+        results: list[ExtractionResult | None] = [None] * len(texts)
+        for i, result in self.iter_batch_extract_all_domains(
+            texts,
+            batch_size=batch_size,
+            include_confidence=include_confidence,
+            include_spans=include_spans,
+        ):
+            results[i] = result
         return results
 
+    def iter_batch_extract_with_auto_domains(
+        self,
+        texts: list[str],
+        batch_size: int = 32,
+        domain_threshold: float = 0.3,
+        max_domains: int = 3,
+        include_confidence: bool = True,
+        include_spans: bool = True,
+    ) -> Iterator[tuple[int, ExtractionResult]]:
+        """
+        Streaming variant of batch_extract_with_auto_domains.
+
+        Yields:
+            (index, ExtractionResult) for short texts first, then for the
+            classified texts as their length buckets complete
+        """
+        start_ns = time.perf_counter_ns()
+
+        # Short texts: classification is unreliable and barely cheaper than
+        # extraction, so they skip it and use the all-domains schema
+        short_idx: list[int] = []
+        long_idx: list[int] = []
+        for i, text in enumerate(texts):
+            (short_idx if len(text.split()) < settings.classify_min_words else long_idx).append(i)
+
+        if short_idx:
+            for j, result in self.iter_batch_extract_all_domains(
+                [texts[i] for i in short_idx],
+                batch_size=batch_size,
+                include_confidence=include_confidence,
+                include_spans=include_spans,
+            ):
+                yield short_idx[j], result
+
+        if long_idx:
+            logger.info(f"Classifying {len(long_idx)} texts for domain detection...")
+            # Forward passes are serialized (see _inference_context), so pipelining
+            # classification with extraction gains nothing: classify everything,
+            # then extract with ONE merged schema
+            long_texts = [texts[i] for i in long_idx]
+            # Classification is lighter, use 2x batch_size
+            all_domains = self.classify_domains_batch(long_texts, threshold=domain_threshold, batch_size=batch_size * 2)
+            for j, result in self._iter_extract_with_domains(
+                long_texts, all_domains, max_domains, batch_size, include_confidence, include_spans
+            ):
+                yield long_idx[j], result
+
+        total_time = (time.perf_counter_ns() - start_ns) / 1e6
+        logger.info(f"Auto-domain batch extraction completed in {total_time:.0f}ms")
+
     def batch_extract_with_auto_domains(
         self,
         texts: list[str],
@@ -574,10 +1241,14 @@ class GLiNERExtractor:
         include_spans: bool = True,
     ) -> list[ExtractionResult]:
         """
-        Batch extract with automatic domain detection and grouping.
+        Batch extract with automatic domain detection.
 
-        Groups texts by detected domain combination for efficient batch processing.
-        This is the optimal method for processing mixed-domain documents.
+        Texts are classified first (in batches of 2x batch_size). Detected
+        domain combinations are then merged into ONE schema so all texts go
+        through a single extraction pass (no small per-combination batches),
+        and each result is filtered down to the types of its own detected
+        domains. Texts shorter than settings.classify_min_words skip
+        classification and are extracted with the all-domains schema.
 
         Args:
             texts: List of texts to extract from
@@ -590,57 +1261,80 @@ class GLiNERExtractor:
         Returns:
             List of ExtractionResult (in original order)
         """
-        start_time = time.time()
-
-        # Step 1: Batch classify all texts (classification is lighter, use 2x batch_size)
-        logger.info(f"Classifying {len(texts)} texts for domain detection...")
-        all_domains = self.classify_domains_batch(texts, threshold=domain_threshold, batch_size=batch_size * 2)
-        classifications = [domains[:max_domains] for domains in all_domains]  # Limit domains
-
-        # Step 2: Group by domain combination (sorted for consistency)
-        batches: dict[tuple[str, ...], list[tuple[int, str]]] = defaultdict(list)
-        for idx, (text, domains) in enumerate(zip(texts, classifications)):
-            domain_labels = [d["label"] for d in domains if d.get("label")]
-            # Sort domains for consistent grouping (same combo = same key)
-            domain_key = tuple(sorted(domain_labels)) if domain_labels else ("default",)
-            batches[domain_key].append((idx, text))
-
-        logger.info(f"Grouped into {len(batches)} domain batches: {list(batches.keys())}")
-
-        # Step 3: Process each group with merged preset
-        results: dict[int, ExtractionResult] = {}
+        results: list[ExtractionResult | None] = [None] * len(texts)
+        for i, result in self.iter_batch_extract_with_auto_domains(
+            texts,
+            batch_size=batch_size,
+            domain_threshold=domain_threshold,
+            max_domains=max_domains,
+            include_confidence=include_confidence,
+            include_spans=include_spans,
+        ):
+            results[i] = result
+        return results
 
-        for domain_key, indexed_texts in batches.items():
-            # Get merged schema for this domain combination
+    def _iter_extract_with_domains(
+        self,
+        texts: list[str],
+        all_domains: list[list[dict[str, Any]]],
+        max_domains: int,
+        batch_size: int,
+        include_confidence: bool,
+        include_spans: bool,
+    ) -> Iterator[tuple[int, ExtractionResult]]:
+        """Extract texts with the merged schema of their detected domains, then filter per text."""
+        # Domain combination per text (sorted for consistency)
+        text_domain_keys: list[tuple[str, ...]] = []
+        for domains in all_domains:
+            domain_labels = [d["label"] for d in domains[:max_domains] if d.get("label")]
+            text_domain_keys.append(tuple(sorted(domain_labels)) if domain_labels else ("default",))
+
+        # Merge the schemas of all combinations, remember what each one allows
+        entity_types: dict[str, str] = {}
+        relation_types: dict[str, str] = {}
+        allowed_types: dict[tuple[str, ...], tuple[frozenset[str], frozenset[str]]] = {}
+        for domain_key in dict.fromkeys(text_domain_keys):
             if domain_key == ("default",):
-                entity_types = settings.default_entity_types
-                relation_types = settings.default_relation_types
+                key_entities = config.DEFAULT_ENTITY_TYPES
+                key_relations = config.DEFAULT_RELATION_TYPES
             else:
-                entity_types, relation_types = self.get_preset_schema(list(domain_key))
+                key_entities, key_relations = self.get_preset_schema(list(domain_key))
+            if not isinstance(key_entities, Mapping):
+                key_entities = dict.fromkeys(key_entities, "")
+            key_relations = key_relations or {}
 
-            # Extract for this batch
-            batch_texts = [text for _, text in indexed_texts]
-            batch_results = self.batch_extract(
-                batch_texts,
-                entity_types=entity_types,
-                relation_types=relation_types,
-                batch_size=batch_size,
-                include_confidence=include_confidence,
-                include_spans=include_spans,
-            )
+            for et, description in key_entities.items():
+                if description or et not in entity_types:
+                    entity_types[et] = description
+            relation_types.update(key_relations)
+            allowed_types[domain_key] = (frozenset(key_entities), frozenset(key_relations))
 
-            # Map results back to original indices
-            for (orig_idx, _), result in zip(indexed_texts, batch_results):
-                results[orig_idx] = result
+        logger.debug(f"Merged {len(allowed_types)} domain combinations into one schema: {list(allowed_types.keys())}")
 
-        # Return in original order
-        total_time = (time.time() - start_time) * 1000
-        logger.info(f"Auto-domain batch extraction completed in {total_time:.0f}ms")
+        # Single extraction pass over all texts
+        pairs = self.iter_batch_extract(
+            texts,
+            # Keep descriptions if any, otherwise legacy list format
+            entity_types=entity_types if any(entity_types.values()) else list(entity_types),
+            relation_types=relation_types,
+            batch_size=batch_size,
+            include_confidence=include_confidence,
+            include_spans=include_spans,
+        )
 
-        return [results[i] for i in range(len(texts))]
+        # Drop types that don't belong to each text's own domains
+        if len(allowed_types) == 1:
+            yield from pairs
+            return
+        for i, result in pairs:
+            allowed_entities, allowed_relations = allowed_types[text_domain_keys[i]]
+            result.entities = [e for e in result.entities if e.type in allowed_entities]
+            result.relations = [r for r in result.relations if r.predicate in allowed_relations]
+            yield i, result
 
 
 # Singleton instance
+_extractor_lock = threading.Lock()
 _extractor: GLiNERExtractor | None = None
 
 
@@ -648,11 +1342,28 @@ def get_extractor() -> GLiNERExtractor:
     """Get or create the singleton extractor."""
     global _extractor
     if _extractor is None:
-        _extractor = GLiNERExtractor()
+        with _extractor_lock:
+            if _extractor is None:
+                _extractor = GLiNERExtractor()
     return _extractor
 
 
 def reset_extractor() -> None:
     """Reset the singleton extractor (for testing)."""
     global _extractor
-    _extractor = None
+    with _extractor_lock:
+        _extractor = None
+
+
+def warm_start() -> None:
+    """Load the model and run warmup passes ahead of the first request."""
+    try:
+        extractor = get_extractor()
+        _ = extractor.model
+        extractor.prebuild_schemas()
+        # With compile_model, loading already ran the warmup
+        if not settings.compile_model:
+            extractor._prewarm()
+    except Exception as e:
+        logger.error(f"Eager model load failed: {e}")
+
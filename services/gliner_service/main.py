@@ -9,15 +9,29 @@ Endpoints:
 - GET /config - Current configuration
 """
 
+import asyncio
+import contextlib
+import functools
 import logging
 import os
+import queue
+import threading
+from typing import Any
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
 from pathlib import Path
+from time import perf_counter_ns
 
-from fastapi import FastAPI, HTTPException
+import msgspec
+import orjson
+from fastapi import FastAPI, HTTPException, Response
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 
-from config import settings, DOMAIN_PRESETS, SKIP_EMBEDDING_TYPES, reload_config, get_available_domains
+import config
+from config import settings, reload_config, get_available_domains
 from models import (
     ExtractionRequest,
     BatchExtractionRequest,
@@ -26,7 +40,7 @@ from models import (
     HealthResponse,
     ConfigResponse,
 )
-from extractor import get_extractor, GLiNERExtractor
+from extractor import get_extractor, warm_start, GLiNERExtractor, CHUNK_SIZE
 
 # Configure logging with file output
 LOG_DIR = Path.home() / ".ragforge" / "logs" / "gliner-service"
@@ -41,37 +55,188 @@ console_handler = logging.StreamHandler()
 console_handler.setFormatter(formatter)
 
 # File handler with rotation
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 file_handler = RotatingFileHandler(
     LOG_FILE, maxBytes=5*1024*1024, backupCount=3
 )
 file_handler.setFormatter(formatter)
 
+# Handlers run on a listener thread (started in lifespan): request code only
+# enqueues records, formatting and disk writes/rotation happen off the event loop
+log_queue = queue.SimpleQueue()
+log_listener = QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+queue_handler = QueueHandler(log_queue)
+# Message (and traceback) only: the listener's handlers apply `formatter`
+queue_handler.setFormatter(logging.Formatter("%(message)s"))
+
 # Configure root logger
 logging.basicConfig(
     level=logging.INFO,
-    handlers=[console_handler, file_handler]
+    handlers=[queue_handler]
 )
 logger = logging.getLogger(__name__)
 
 
+# Shared by every msgspec response (extraction structs encode without a model_dump)
+_json_encoder = msgspec.json.Encoder()
+
+
+def msgspec_response(content: Any) -> Response:
+    """JSON response for msgspec results (encoded directly, no revalidation)."""
+    return Response(content=_json_encoder.encode(content), media_type="application/json")
+
+
+# Encoded bodies of responses that only depend on the YAML config, cleared by /config/reload
+_config_responses: dict[str, bytes] = {}
+
+
+def cached_config_response(key: str, build: Callable[[], Any]) -> Response:
+    """JSON response encoded once from build() and reused until the config is reloaded."""
+    body = _config_responses.get(key)
+    if body is None:
+        body = _config_responses[key] = orjson.dumps(jsonable_encoder(build()))
+    return Response(content=body, media_type="application/json")
+
+
+def ndjson_response(pairs: Iterator[tuple[int, ExtractionResult]]) -> StreamingResponse:
+    """
+    NDJSON response with one {"index": ..., "result": ...} line per text.
+
+    Lines are written as soon as their batch completes, so they are not in
+    input order; "index" points back into the request's texts.
+    """
+    def lines() -> Iterator[bytes]:
+        try:
+            for index, result in pairs:
+                yield _json_encoder.encode({"index": index, "result": result}) + b"\n"
+        except Exception as e:
+            # Headers are already sent, the client sees a truncated stream
+            logger.error(f"Streaming extraction failed: {e}", exc_info=True)
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+def dedupe_texts(texts: list[str]) -> tuple[list[str], list[int]]:
+    """Unique texts in first-seen order, and each input's position among them."""
+    positions: dict[str, int] = {}
+    inverse = [positions.setdefault(text, len(positions)) for text in texts]
+    return list(positions), inverse
+
+
+def fan_out(
+    pairs: Iterator[tuple[int, ExtractionResult]], inverse: list[int]
+) -> Iterator[tuple[int, ExtractionResult]]:
+    """Map (unique text index, result) pairs back to every input index with that text."""
+    owners: list[list[int]] = [[] for _ in range(max(inverse, default=-1) + 1)]
+    for i, j in enumerate(inverse):
+        owners[j].append(i)
+    for j, result in pairs:
+        for i in owners[j]:
+            yield i, result
+
+
+async def run_inference(func: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Any:
+    """
+    Run a blocking extraction call on the inference executor.
+
+    Forward passes are serialized by the extractor's inference lock anyway:
+    keeping them on their own executor leaves the default one (cache hits,
+    /config/reload, /model/unload) free while long batches run.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(app.state.inference_executor, functools.partial(func, *args, **kwargs))
+
+
+async def coalesce_extractions(queue: asyncio.Queue) -> None:
+    """
+    Serve queued single-text /extract requests in batches.
+
+    Collects up to default_batch_size requests, waiting at most
+    coalesce_window_ms after the first one, then runs one batch_extract call
+    per schema signature and resolves each request's future.
+    """
+    loop = asyncio.get_running_loop()
+    window = settings.coalesce_window_ms / 1000
+    while True:
+        items = [await queue.get()]
+        deadline = loop.time() + window
+        while len(items) < settings.default_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                items.append(await asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        groups: dict[tuple, list[tuple[ExtractionRequest, asyncio.Future]]] = {}
+        for request, future in items:
+            groups.setdefault(request.schema_signature(), []).append((request, future))
+
+        for group in groups.values():
+            first = group[0][0]
+            start_ns = perf_counter_ns()
+            try:
+                results = await run_inference(
+                    app.state.extractor.batch_extract,
+                    [request.text for request, _ in group],
+                    entity_types=first.entity_types,
+                    relation_types=first.relation_types,
+                    batch_size=len(group),
+                    include_confidence=first.include_confidence,
+                    include_spans=first.include_spans,
+                )
+            except Exception as e:
+                for _, future in group:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            # Each request waited for the whole batch call, not just its own parse
+            batch_time = (perf_counter_ns() - start_ns) / 1e6
+            for (_, future), result in zip(group, results):
+                result.processing_time_ms = batch_time
+                # Skip requests whose client went away
+                if not future.done():
+                    future.set_result(result)
+
+        logger.debug(f"Coalesced {len(items)} /extract requests into {len(groups)} batch calls")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan context manager for startup/shutdown."""
-    # Startup: preload model
+    log_listener.start()
     logger.info("Starting GLiNER Entity Extraction Service...")
-    try:
-        extractor = get_extractor()
-        # Warm up the model
-        _ = extractor.model
-        logger.info("Model loaded successfully")
-    except Exception as e:
-        logger.error(f"Failed to load model: {e}")
+    # Bound once here, handlers read app.state.extractor
+    app.state.extractor = get_extractor()
+    # Extraction calls run here (see run_inference), one at a time like the
+    # forward passes they wrap; lighter calls use asyncio.to_thread
+    app.state.inference_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gliner-inference")
+    if settings.eager_load:
+        # Load and warm up in the background, /health answers in the meantime
+        threading.Thread(target=warm_start, name="gliner-warm-start", daemon=True).start()
+    else:
+        # No VRAM used until the first extraction (or POST /model/load)
+        logger.info("Model will be loaded on first request")
+
+    # Single-text /extract requests are queued and served in batches
+    app.state.extract_queue = None
+    coalescer = None
+    if settings.coalesce_window_ms > 0:
+        app.state.extract_queue = asyncio.Queue()
+        coalescer = asyncio.create_task(coalesce_extractions(app.state.extract_queue))
 
     yield
 
     # Shutdown
     logger.info("Shutting down GLiNER service...")
+    if coalescer is not None:
+        coalescer.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await coalescer
+    app.state.inference_executor.shutdown(wait=False, cancel_futures=True)
+    # Flushes queued records
+    log_listener.stop()
 
 
 app = FastAPI(
@@ -79,6 +244,7 @@ app = FastAPI(
     description="Entity and relation extraction using GLiNER2",
     version="0.1.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware
@@ -95,7 +261,7 @@ app.add_middleware(
 async def health_check():
     """Check service health and model status."""
     try:
-        extractor = get_extractor()
+        extractor = app.state.extractor
         model_loaded = extractor.is_loaded()
         return HealthResponse(
             status="ok",
@@ -121,8 +287,8 @@ async def unload_model():
     The model will be automatically reloaded on the next extraction request.
     """
     try:
-        extractor = get_extractor()
-        was_loaded = extractor.unload()
+        extractor = app.state.extractor
+        was_loaded = await asyncio.to_thread(extractor.unload)
         return {
             "status": "ok",
             "was_loaded": was_loaded,
@@ -141,7 +307,7 @@ async def load_model():
     Use this after Ollama embeddings are done to prepare for entity extraction.
     """
     try:
-        extractor = get_extractor()
+        extractor = app.state.extractor
         if extractor.is_loaded():
             return {
                 "status": "ok",
@@ -149,7 +315,7 @@ async def load_model():
                 "message": "Model was already loaded",
             }
         # Access model property to trigger lazy loading
-        _ = extractor.model
+        await asyncio.to_thread(lambda: extractor.model)
         return {
             "status": "ok",
             "was_loaded": False,
@@ -164,22 +330,23 @@ async def load_model():
 async def get_config():
     """Get current service configuration."""
     return ConfigResponse(
-        default_entity_types=settings.default_entity_types,
-        default_relation_types=settings.default_relation_types,
+        default_entity_types=config.DEFAULT_ENTITY_TYPES,
+        default_relation_types=config.DEFAULT_RELATION_TYPES,
         model_name=settings.model_name,
         batch_size=settings.default_batch_size,
         device=settings.device,
-        skip_embedding_types=SKIP_EMBEDDING_TYPES,
+        precision=settings.precision,
+        skip_embedding_types=config.SKIP_EMBEDDING_TYPES,
     )
 
 
 @app.get("/presets")
 async def get_presets():
     """Get available domain presets."""
-    return {
-        "presets": DOMAIN_PRESETS,
+    return cached_config_response("presets", lambda: {
+        "presets": config.DOMAIN_PRESETS,
         "available_domains": get_available_domains(),
-    }
+    })
 
 
 @app.post("/config/reload")
@@ -191,6 +358,11 @@ async def reload_configuration():
     """
     try:
         reload_config()
+        _config_responses.clear()
+        # Cached classifications were made against the old domain labels
+        app.state.extractor.clear_classification_cache()
+        if app.state.extractor.is_loaded():
+            await asyncio.to_thread(app.state.extractor.prebuild_schemas)
         return {
             "status": "ok",
             "message": "Configuration reloaded",
@@ -204,9 +376,14 @@ async def reload_configuration():
 @app.get("/domains")
 async def list_domains():
     """List available domains with their entity and relation types."""
+    return cached_config_response("domains", _domains_info)
+
+
+def _domains_info() -> dict[str, Any]:
     domains_info = {}
+    domain_presets = config.DOMAIN_PRESETS
     for domain_name in get_available_domains():
-        preset = DOMAIN_PRESETS.get(domain_name, {})
+        preset = domain_presets.get(domain_name, {})
         domains_info[domain_name] = {
             "entity_types": preset.get("entity_types", []),
             "relation_types": list(preset.get("relation_types", {}).keys()),
@@ -219,7 +396,7 @@ async def list_domains():
     }
 
 
-@app.post("/extract", response_model=ExtractionResult)
+@app.post("/extract")
 async def extract_entities(request: ExtractionRequest):
     """
     Extract entities and relations from a single text.
@@ -227,47 +404,93 @@ async def extract_entities(request: ExtractionRequest):
     Optionally specify entity_types and relation_types for custom extraction.
     """
     try:
-        extractor = get_extractor()
-        result = extractor.extract(
-            text=request.text,
-            entity_types=request.entity_types,
-            relation_types=request.relation_types,
-            include_confidence=request.include_confidence,
-            include_spans=request.include_spans,
-        )
-        return result
+        extractor = app.state.extractor
+        if len(request.text) > CHUNK_SIZE:
+            # Past GLiNER2's context window: extract overlapping chunks in one batch
+            results = await run_inference(
+                extractor.batch_extract_chunked,
+                [request.text],
+                entity_types=request.entity_types,
+                relation_types=request.relation_types,
+                include_confidence=request.include_confidence,
+                include_spans=request.include_spans,
+            )
+            result = results[0]
+        elif app.state.extract_queue is not None:
+            # Batched with concurrent /extract calls (see coalesce_extractions)
+            future = asyncio.get_running_loop().create_future()
+            app.state.extract_queue.put_nowait((request, future))
+            result = await future
+        else:
+            result = await run_inference(
+                extractor.extract,
+                text=request.text,
+                entity_types=request.entity_types,
+                relation_types=request.relation_types,
+                include_confidence=request.include_confidence,
+                include_spans=request.include_spans,
+            )
+        return msgspec_response(result)
     except Exception as e:
         logger.error(f"Extraction failed: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/extract/batch", response_model=BatchExtractionResult)
-async def extract_batch(request: BatchExtractionRequest):
+@app.post("/extract/batch")
+async def extract_batch(request: BatchExtractionRequest, stream: bool = False):
     """
     Batch extract entities and relations from multiple texts.
 
     More efficient than calling /extract multiple times.
+    With stream=true, results are returned as NDJSON as each batch completes.
     """
-    import time
-    start_time = time.time()
+    start_ns = perf_counter_ns()
 
     try:
-        extractor = get_extractor()
-        results = extractor.batch_extract(
-            texts=request.texts,
+        extractor = app.state.extractor
+        # Extraction is deterministic per text: duplicates (boilerplate) run once
+        unique, inverse = dedupe_texts(request.texts)
+        if stream:
+            if any(len(text) > CHUNK_SIZE for text in unique):
+                # Chunked texts are only complete once all their chunks are merged
+                pairs = enumerate(await run_inference(
+                    extractor.batch_extract_chunked,
+                    texts=unique,
+                    entity_types=request.entity_types,
+                    relation_types=request.relation_types,
+                    batch_size=request.batch_size,
+                    include_confidence=request.include_confidence,
+                    include_spans=request.include_spans,
+                ))
+            else:
+                pairs = extractor.iter_batch_extract(
+                    texts=unique,
+                    entity_types=request.entity_types,
+                    relation_types=request.relation_types,
+                    batch_size=request.batch_size,
+                    include_confidence=request.include_confidence,
+                    include_spans=request.include_spans,
+                )
+            return ndjson_response(fan_out(pairs, inverse))
+
+        results = await run_inference(
+            extractor.batch_extract_chunked,
+            texts=unique,
             entity_types=request.entity_types,
             relation_types=request.relation_types,
             batch_size=request.batch_size,
             include_confidence=request.include_confidence,
             include_spans=request.include_spans,
         )
+        results = [results[j] for j in inverse]
 
-        total_time = (time.time() - start_time) * 1000
-        return BatchExtractionResult(
+        total_time = (perf_counter_ns() - start_ns) / 1e6
+        batch_result = BatchExtractionResult(
             results=results,
             total_processing_time_ms=total_time,
             texts_processed=len(request.texts),
         )
+        return msgspec_response(batch_result)
     except Exception as e:
         logger.error(f"Batch extraction failed: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -280,32 +503,45 @@ async def extract_with_auto_domains(
     domain_threshold: float = 0.3,
     include_confidence: bool = True,
     include_spans: bool = True,
+    stream: bool = False,
 ):
     """
     Extract with automatic domain detection.
 
     Groups texts by detected domain for efficient batch processing.
     Uses merged presets based on detected domains.
+    With stream=true, results are returned as NDJSON as each chunk completes.
     """
-    import time
-    start_time = time.time()
+    start_ns = perf_counter_ns()
 
     try:
-        extractor = get_extractor()
-        results = extractor.batch_extract_with_auto_domains(
-            texts=texts,
+        extractor = app.state.extractor
+        unique, inverse = dedupe_texts(texts)
+        if stream:
+            return ndjson_response(fan_out(extractor.iter_batch_extract_with_auto_domains(
+                texts=unique,
+                batch_size=batch_size,
+                domain_threshold=domain_threshold,
+                include_confidence=include_confidence,
+                include_spans=include_spans,
+            ), inverse))
+
+        results = await run_inference(
+            extractor.batch_extract_with_auto_domains,
+            texts=unique,
             batch_size=batch_size,
             domain_threshold=domain_threshold,
             include_confidence=include_confidence,
             include_spans=include_spans,
         )
+        results = [results[j] for j in inverse]
 
-        total_time = (time.time() - start_time) * 1000
-        return {
-            "results": [r.model_dump() for r in results],
-            "total_processing_time_ms": total_time,
-            "texts_processed": len(texts),
-        }
+        total_time = (perf_counter_ns() - start_ns) / 1e6
+        return msgspec_response(BatchExtractionResult(
+            results=results,
+            total_processing_time_ms=total_time,
+            texts_processed=len(texts),
+        ))
     except Exception as e:
         logger.error(f"Auto extraction failed: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -317,31 +553,43 @@ async def extract_all_domains(
     batch_size: int = 32,
     include_confidence: bool = True,
     include_spans: bool = True,
+    stream: bool = False,
 ):
     """
     Extract using ALL entity types from ALL domains.
 
     Skips domain classification - faster but may have more noise.
     Use this when speed is critical or documents are mixed-domain.
+    With stream=true, results are returned as NDJSON as each batch completes.
     """
-    import time
-    start_time = time.time()
+    start_ns = perf_counter_ns()
 
     try:
-        extractor = get_extractor()
-        results = extractor.batch_extract_all_domains(
-            texts=texts,
+        extractor = app.state.extractor
+        unique, inverse = dedupe_texts(texts)
+        if stream:
+            return ndjson_response(fan_out(extractor.iter_batch_extract_all_domains(
+                texts=unique,
+                batch_size=batch_size,
+                include_confidence=include_confidence,
+                include_spans=include_spans,
+            ), inverse))
+
+        results = await run_inference(
+            extractor.batch_extract_all_domains,
+            texts=unique,
             batch_size=batch_size,
             include_confidence=include_confidence,
             include_spans=include_spans,
         )
+        results = [results[j] for j in inverse]
 
-        total_time = (time.time() - start_time) * 1000
-        return {
-            "results": [r.model_dump() for r in results],
-            "total_processing_time_ms": total_time,
-            "texts_processed": len(texts),
-        }
+        total_time = (perf_counter_ns() - start_ns) / 1e6
+        return msgspec_response(BatchExtractionResult(
+            results=results,
+            total_processing_time_ms=total_time,
+            texts_processed=len(texts),
+        ))
     except Exception as e:
         logger.error(f"All-domains extraction failed: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -358,8 +606,8 @@ async def classify_domains(
     Returns detected domains with confidence scores.
     """
     try:
-        extractor = get_extractor()
-        domains = extractor.classify_domains(text, threshold=threshold)
+        extractor = app.state.extractor
+        domains = await asyncio.to_thread(extractor.classify_domains, text, threshold=threshold)
         return {
             "text_preview": text[:100] + "..." if len(text) > 100 else text,
             "detected_domains": domains,
@@ -382,18 +630,20 @@ async def classify_domains_batch(
     More efficient than calling /classify multiple times.
     Returns a list of domain classifications, one per input text.
     """
-    import time
-    start_time = time.time()
+    start_ns = perf_counter_ns()
 
     try:
-        extractor = get_extractor()
-        classifications = extractor.classify_domains_batch(
-            texts=texts,
+        extractor = app.state.extractor
+        unique, inverse = dedupe_texts(texts)
+        classifications = await asyncio.to_thread(
+            extractor.classify_domains_batch,
+            texts=unique,
             threshold=threshold,
             batch_size=batch_size,
         )
+        classifications = [classifications[j] for j in inverse]
 
-        total_time = (time.time() - start_time) * 1000
+        total_time = (perf_counter_ns() - start_ns) / 1e6
         return {
             "classifications": classifications,
             "total_processing_time_ms": total_time,
@@ -412,7 +662,12 @@ def main():
         "gliner_service.main:app",
         host=settings.host,
         port=settings.port,
-        reload=True,
+        reload=settings.reload,
+        workers=settings.workers,
+        # "auto" picks uvloop/httptools when installed (uvicorn[standard]),
+        # and falls back to asyncio/h11 where they are not (Windows, slim images)
+        loop="auto",
+        http="auto",
     )
 
 
@@ -1,19 +1,38 @@
 """
-Pydantic models for GLiNER Entity Extraction Service.
+Pydantic models (requests, config) and msgspec structs (extraction results)
+for GLiNER Entity Extraction Service.
 """
 
-from pydantic import BaseModel, Field
-from typing import Any
+import msgspec
+from pydantic import BaseModel, Field, field_validator
+from typing import Any, Literal
 
 
 # ===== REQUEST MODELS =====
 
+def _clean_entity_types(value: list[str] | None) -> list[str] | None:
+    """Strip and dedupe entity types (order kept)."""
+    if value is None:
+        return None
+    cleaned = list(dict.fromkeys(t.strip() for t in value if t.strip()))
+    # Nothing left (the TS client sends [] by default): use the server defaults
+    return cleaned or None
+
+
+def _clean_relation_types(value: dict[str, str] | None) -> dict[str, str] | None:
+    """Strip relation names and drop blank ones."""
+    if value is None:
+        return None
+    # An empty mapping stays empty: {} asks for no relations, None for the defaults
+    return {name.strip(): description for name, description in value.items() if name.strip()}
+
+
 class ExtractionRequest(BaseModel):
     """Request for entity/relation extraction."""
     text: str = Field(..., description="Text to extract from")
-    entity_types: list[str] = Field(
+    entity_types: list[str] | None = Field(
         default=["person", "organization", "location", "technology", "product", "price"],
-        description="Entity types to extract"
+        description="Entity types to extract (empty: server defaults)"
     )
     relation_types: dict[str, str] | None = Field(
         default=None,
@@ -22,13 +41,37 @@ class ExtractionRequest(BaseModel):
     include_confidence: bool = Field(default=True, description="Include confidence scores")
     include_spans: bool = Field(default=True, description="Include character spans")
 
+    @field_validator("entity_types")
+    @classmethod
+    def clean_entity_types(cls, value: list[str] | None) -> list[str] | None:
+        return _clean_entity_types(value)
+
+    @field_validator("relation_types")
+    @classmethod
+    def clean_relation_types(cls, value: dict[str, str] | None) -> dict[str, str] | None:
+        return _clean_relation_types(value)
+
+    def schema_signature(self) -> tuple:
+        """
+        Requests with the same signature can share one batch_extract call.
+
+        Label order is kept: it is the order of the prompt GLiNER2 encodes.
+        None (server defaults) and {} (no relations) stay distinct.
+        """
+        return (
+            None if self.entity_types is None else tuple(self.entity_types),
+            None if self.relation_types is None else tuple(self.relation_types.items()),
+            self.include_confidence,
+            self.include_spans,
+        )
+
 
 class BatchExtractionRequest(BaseModel):
     """Request for batch entity/relation extraction."""
     texts: list[str] = Field(..., description="List of texts to extract from")
-    entity_types: list[str] = Field(
+    entity_types: list[str] | None = Field(
         default=["person", "organization", "location", "technology", "product", "price"],
-        description="Entity types to extract"
+        description="Entity types to extract (empty: server defaults)"
     )
     relation_types: dict[str, str] | None = Field(
         default=None,
@@ -38,38 +81,53 @@ class BatchExtractionRequest(BaseModel):
     include_spans: bool = Field(default=True, description="Include character spans")
     batch_size: int = Field(default=32, ge=1, le=128, description="Batch size for processing")
 
+    @field_validator("entity_types")
+    @classmethod
+    def clean_entity_types(cls, value: list[str] | None) -> list[str] | None:
+        return _clean_entity_types(value)
+
+    @field_validator("relation_types")
+    @classmethod
+    def clean_relation_types(cls, value: dict[str, str] | None) -> dict[str, str] | None:
+        return _clean_relation_types(value)
+
 
 # ===== RESPONSE MODELS =====
 
-class ExtractedEntity(BaseModel):
+# Extraction results are built by trusted internal code: msgspec structs are
+# encoded straight to JSON without revalidation (see main.py). Structs are
+# slotted, and None-valued optional fields are omitted from the output.
+
+class ExtractedEntity(msgspec.Struct, omit_defaults=True):
     """An extracted entity."""
-    name: str = Field(..., description="Entity text")
-    type: str = Field(..., description="Entity type")
-    confidence: float | None = Field(None, ge=0, le=1, description="Confidence score")
-    span: tuple[int, int] | None = Field(None, description="Character span [start, end]")
-    properties: dict[str, Any] | None = Field(None, description="Additional properties")
+    name: str  # Entity text
+    type: str  # Entity type
+    confidence: float | None = None  # Confidence score (0-1)
+    span: tuple[int, int] | None = None  # Character span [start, end]
+    properties: dict[str, Any] | None = None  # Additional properties
 
 
-class ExtractedRelation(BaseModel):
+class ExtractedRelation(msgspec.Struct, omit_defaults=True):
     """An extracted relation between entities."""
-    subject: str = Field(..., description="Subject entity name")
-    predicate: str = Field(..., description="Relation type")
-    object: str = Field(..., description="Object entity name")
-    confidence: float | None = Field(None, ge=0, le=1, description="Confidence score")
+    subject: str  # Subject entity name
+    predicate: str  # Relation type
+    object: str  # Object entity name
+    confidence: float | None = None  # Confidence score (0-1)
 
 
-class ExtractionResult(BaseModel):
+class ExtractionResult(msgspec.Struct):
     """Result of extraction for a single text."""
-    entities: list[ExtractedEntity] = Field(default_factory=list)
-    relations: list[ExtractedRelation] = Field(default_factory=list)
-    processing_time_ms: float = Field(..., description="Processing time in milliseconds")
+    # No defaults: empty lists are still encoded as []
+    entities: list[ExtractedEntity]
+    relations: list[ExtractedRelation]
+    processing_time_ms: float  # Processing time in milliseconds
 
 
-class BatchExtractionResult(BaseModel):
+class BatchExtractionResult(msgspec.Struct):
     """Result of batch extraction."""
-    results: list[ExtractionResult] = Field(..., description="Results for each input text")
-    total_processing_time_ms: float = Field(..., description="Total processing time")
-    texts_processed: int = Field(..., description="Number of texts processed")
+    results: list[ExtractionResult]  # Results for each input text
+    total_processing_time_ms: float  # Total processing time
+    texts_processed: int  # Number of texts processed
 
 
 class HealthResponse(BaseModel):
@@ -82,11 +140,15 @@ class HealthResponse(BaseModel):
 
 class ConfigResponse(BaseModel):
     """Configuration response."""
-    default_entity_types: list[str]
+    default_entity_types: list[str] | dict[str, str]
     default_relation_types: dict[str, str]
     model_name: str
     batch_size: int
     device: str
+    precision: Literal["fp32", "int8", "bf16", "fp16"] = Field(
+        default="fp32",
+        description="Inference precision (int8 applies on CPU only, bf16/fp16 on CUDA only)"
+    )
     skip_embedding_types: list[str] = Field(
         default_factory=list,
         description="Entity types that should skip embedding generation (numeric/value types)"
@@ -0,0 +1,80 @@
+"""
+Ray Serve deployment for GLiNER2 extraction.
+
+Alternative to main.py when running under Ray: concurrent single-text
+requests are coalesced by @serve.batch into one batch_extract call
+instead of one forward pass each.
+
+Requires: pip install "ray[serve]"
+
+Usage:
+    serve run server:app
+"""
+
+import asyncio
+import logging
+from collections import defaultdict
+from time import perf_counter_ns
+
+import msgspec
+from pydantic import ValidationError
+from ray import serve
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+from config import settings
+from extractor import get_extractor
+from models import ExtractionRequest, ExtractionResult
+
+logger = logging.getLogger(__name__)
+
+
+@serve.deployment
+class GLiNERServer:
+    """Single-text extraction endpoint with dynamic cross-request batching."""
+
+    def __init__(self):
+        self.extractor = get_extractor()
+        # Load the model before the replica accepts traffic
+        _ = self.extractor.model
+
+    @serve.batch(max_batch_size=settings.default_batch_size, batch_wait_timeout_s=0.02)
+    async def extract_batch(self, requests: list[ExtractionRequest]) -> list[ExtractionResult]:
+        """Extract a batch of queued requests, one batch_extract call per schema signature."""
+        groups: dict[tuple, list[int]] = defaultdict(list)
+        for i, request in enumerate(requests):
+            groups[request.schema_signature()].append(i)
+
+        results: list[ExtractionResult | None] = [None] * len(requests)
+        for indices in groups.values():
+            first = requests[indices[0]]
+            start_ns = perf_counter_ns()
+            # Off the replica's event loop, so queued requests keep batching up
+            group_results = await asyncio.to_thread(
+                self.extractor.batch_extract,
+                [requests[i].text for i in indices],
+                entity_types=first.entity_types,
+                relation_types=first.relation_types,
+                batch_size=len(indices),
+                include_confidence=first.include_confidence,
+                include_spans=first.include_spans,
+            )
+            batch_time = (perf_counter_ns() - start_ns) / 1e6
+            for i, result in zip(indices, group_results):
+                result.processing_time_ms = batch_time
+                results[i] = result
+
+        logger.debug(f"Served {len(requests)} requests in {len(groups)} batch calls")
+        return results
+
+    async def __call__(self, http_request: Request) -> dict | JSONResponse:
+        """Same request/response body (and 422 on invalid requests) as POST /extract in main.py."""
+        try:
+            request = ExtractionRequest.model_validate(await http_request.json())
+        except ValidationError as e:
+            return JSONResponse({"detail": e.errors(include_url=False, include_context=False)}, status_code=422)
+        result = await self.extract_batch(request)
+        return msgspec.to_builtins(result)
+
+
+app = GLiNERServer.bind()
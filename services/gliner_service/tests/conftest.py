@@ -0,0 +1,11 @@
+"""
+Pytest setup for the GLiNER service tests.
+
+The service modules import each other by flat name (`import config`), as
+when run from the service directory: put that directory on sys.path.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
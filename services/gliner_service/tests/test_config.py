@@ -0,0 +1,76 @@
+"""Tests for the YAML config loader and its pickle cache."""
+
+import datetime
+import json
+import os
+import pickle
+
+from config import load_yaml_config
+
+
+def _write(path, entity_type, mtime_ns=None):
+    path.write_text(f"defaults:\n  entity_types: [{entity_type}]\n")
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def _entity_types(path):
+    return load_yaml_config(path)["defaults"]["entity_types"]
+
+
+def test_missing_file_returns_empty_config(tmp_path):
+    assert load_yaml_config(tmp_path / "missing.yaml") == {}
+
+
+def test_cache_is_written_and_reused(tmp_path):
+    path = tmp_path / "config.yaml"
+    _write(path, "person")
+    assert _entity_types(path) == ["person"]
+    assert (tmp_path / "config.yaml.json").is_file()
+    assert _entity_types(path) == ["person"]
+
+
+def test_cache_is_plain_json_not_pickle(tmp_path):
+    path = tmp_path / "config.yaml"
+    _write(path, "person")
+    # A pickle planted next to the YAML must never be loaded (it could run code)
+    (tmp_path / "config.yaml.pkl").write_bytes(pickle.dumps({"defaults": {"entity_types": ["planted"]}}))
+    assert _entity_types(path) == ["person"]
+    cached = json.loads((tmp_path / "config.yaml.json").read_bytes())
+    assert cached["config"] == {"defaults": {"entity_types": ["person"]}}
+
+
+def test_config_that_does_not_round_trip_is_not_cached(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text("released: 2024-01-01\n")
+    assert load_yaml_config(path)["released"] == datetime.date(2024, 1, 1)
+    assert not (tmp_path / "config.yaml.json").exists()
+
+
+def test_cache_invalidated_by_size_change_with_same_mtime(tmp_path):
+    path = tmp_path / "config.yaml"
+    _write(path, "person")
+    mtime_ns = path.stat().st_mtime_ns
+    assert _entity_types(path) == ["person"]
+
+    # Same mtime (coarse clock, edit during the parse): size still differs
+    _write(path, "organization", mtime_ns)
+    assert _entity_types(path) == ["organization"]
+
+
+def test_cache_invalidated_by_restoring_an_older_file(tmp_path):
+    path = tmp_path / "config.yaml"
+    _write(path, "person")
+    mtime_ns = path.stat().st_mtime_ns
+    assert _entity_types(path) == ["person"]
+
+    # Same size, older mtime (e.g. `git checkout` of a previous version)
+    _write(path, "people", mtime_ns - 10**9)
+    assert _entity_types(path) == ["people"]
+
+
+def test_unreadable_cache_is_ignored(tmp_path):
+    path = tmp_path / "config.yaml"
+    _write(path, "person")
+    (tmp_path / "config.yaml.json").write_bytes(b"not json")
+    assert _entity_types(path) == ["person"]
@@ -0,0 +1,246 @@
+"""
+Tests for the extractor's batching, chunking and parsing logic.
+
+The model is never loaded: forward passes are replaced by fakes.
+"""
+
+import re
+import time
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("gliner2")
+
+from extractor import (
+    BUCKET_MAX_BATCH_MULTIPLIER,
+    BUCKET_WORD_BUDGET,
+    CHUNK_SIZE,
+    GLiNERExtractor,
+    _chunk_text,
+    _prompt_words,
+    _types_key,
+)
+from models import ExtractedEntity, ExtractedRelation, ExtractionRequest, ExtractionResult
+
+
+@pytest.fixture
+def extractor(monkeypatch):
+    """An extractor whose schema building never touches the model."""
+    instance = GLiNERExtractor(device="cpu")
+    monkeypatch.setattr(instance, "_get_schema", lambda *args: None)
+    return instance
+
+
+# ===== CHUNKING =====
+
+def test_short_text_is_a_single_chunk():
+    assert _chunk_text("short text", size=100) == [("short text", 0)]
+
+
+def test_chunks_cover_text_at_their_offsets():
+    text = " ".join(f"word{i}" for i in range(500))
+    chunks = _chunk_text(text, size=100, overlap=20)
+
+    assert chunks[0][1] == 0
+    assert chunks[-1][1] + len(chunks[-1][0]) == len(text)
+    for chunk, offset in chunks:
+        assert text[offset:offset + len(chunk)] == chunk
+        assert len(chunk) <= 100
+        # Chunks start on word boundaries
+        assert offset == 0 or text[offset - 1] == " "
+    for (prev, prev_offset), (_, offset) in zip(chunks, chunks[1:]):
+        # No gap between consecutive chunks, and progress is made
+        assert prev_offset < offset <= prev_offset + len(prev)
+
+
+def test_chunked_merge_shifts_spans_and_dedupes_overlap(monkeypatch, extractor):
+    text = " ".join("Alice" if i % 7 == 0 else "filler" for i in range(800))
+    assert len(text) > CHUNK_SIZE
+    chunk_entities = []
+
+    def batch_extract(chunks, **kwargs):
+        results = []
+        for chunk in chunks:
+            entities = [
+                ExtractedEntity(name="Alice", type="person", span=(m.start(), m.end()))
+                for m in re.finditer("Alice", chunk)
+            ]
+            chunk_entities.append(len(entities))
+            relations = [ExtractedRelation(subject="Alice", predicate="knows", object="Bob")]
+            results.append(ExtractionResult(entities=entities, relations=relations, processing_time_ms=1.0))
+        return results
+
+    monkeypatch.setattr(extractor, "batch_extract", batch_extract)
+    [result] = extractor.batch_extract_chunked([text])
+
+    expected_spans = [(m.start(), m.end()) for m in re.finditer("Alice", text)]
+    assert [entity.span for entity in result.entities] == expected_spans
+    # Overlapping chunks did report some entities twice
+    assert sum(chunk_entities) > len(expected_spans)
+    assert len(result.relations) == 1
+
+
+def test_chunked_processing_time_covers_the_whole_call(monkeypatch, extractor):
+    def batch_extract(chunks, **kwargs):
+        time.sleep(0.02)
+        # Parse-only times, as reported by _parse_extraction_result
+        return [ExtractionResult(entities=[], relations=[], processing_time_ms=0.001) for _ in chunks]
+
+    monkeypatch.setattr(extractor, "batch_extract", batch_extract)
+    results = extractor.batch_extract_chunked(["word " * CHUNK_SIZE, "short"])
+    assert all(result.processing_time_ms >= 20 for result in results)
+
+
+# ===== SCHEMA CACHE =====
+
+def test_types_key_keeps_label_order():
+    assert _types_key(["person", "org"]) != _types_key(["org", "person"])
+    assert _types_key({"a": "x", "b": "y"}) != _types_key({"b": "y", "a": "x"})
+    assert _types_key(None) == _types_key([]) == ()
+
+
+def test_prebuilt_schemas_serve_the_default_request(monkeypatch):
+    class SchemaBuilder:
+        def __init__(self, builds):
+            builds.append(self)
+
+        def entities(self, types):
+            return self
+
+        relations = classification = lambda self, *args, **kwargs: self
+
+    builds = []
+    model = SimpleNamespace(create_schema=lambda: SchemaBuilder(builds))
+    instance = GLiNERExtractor(device="cpu")
+    monkeypatch.setattr(instance, "_model", model)
+    instance.prebuild_schemas()
+    prebuilt = len(builds)
+
+    # Default /extract request: request default entity types, relation_types=None
+    _record_batches(monkeypatch, instance)
+    entity_types = ExtractionRequest.model_fields["entity_types"].default
+    list(instance.iter_batch_extract(["Tim Cook leads Apple."], entity_types=entity_types))
+    assert len(builds) == prebuilt
+
+
+# ===== BUCKET PLANNING =====
+
+def _record_batches(monkeypatch, extractor) -> list[list[str]]:
+    """Replace forward passes with a fake returning each text; record the batches."""
+    batches = []
+
+    def run_batch(batch, schema, prompt_words=0, **kwargs):
+        batches.append(batch)
+        return [{"text": text} for text in batch]
+
+    def parse(raw_result, include_confidence=True, include_spans=True):
+        entity = ExtractedEntity(name=raw_result["text"], type="text")
+        return ExtractionResult(entities=[entity], relations=[], processing_time_ms=0.0)
+
+    monkeypatch.setattr(extractor, "_run_batch", run_batch)
+    monkeypatch.setattr(extractor, "_parse_extraction_result", parse)
+    return batches
+
+
+def test_prompt_words_counts_every_label():
+    # One marker per label, underscores split into words
+    assert _prompt_words(["person", "organization"], {"works_for": "person works for org"}) == 2 + 2 + 3
+    assert _prompt_words(["person"], None) == 2
+
+
+def test_results_come_back_in_input_order(monkeypatch, extractor):
+    _record_batches(monkeypatch, extractor)
+    texts = [" ".join(["w"] * n) + f" #{i}" for i, n in enumerate([50, 3, 400, 3, 120, 9, 50])]
+    results = extractor.batch_extract(texts, entity_types=["person"], relation_types={}, batch_size=2)
+    assert [result.entities[0].name for result in results] == texts
+
+
+def test_short_text_buckets_are_capped(monkeypatch, extractor):
+    batches = _record_batches(monkeypatch, extractor)
+    texts = ["a b c"] * 5000
+    pairs = list(extractor.iter_batch_extract(texts, entity_types=["person"], relation_types={}, batch_size=8))
+
+    assert sorted(index for index, _ in pairs) == list(range(len(texts)))
+    assert max(len(batch) for batch in batches) == 8 * BUCKET_MAX_BATCH_MULTIPLIER
+
+
+def test_bucket_lengths_include_the_label_prompt(monkeypatch, extractor):
+    batches = _record_batches(monkeypatch, extractor)
+    entity_types = [f"type{i}" for i in range(200)]
+    texts = [" ".join(["w"] * 10)] * 100
+    list(extractor.iter_batch_extract(texts, entity_types=entity_types, relation_types={}, batch_size=8))
+
+    # 10 words of text but 400 words of prompt: the padded budget binds first
+    length = 10 + _prompt_words(entity_types)
+    assert max(len(batch) for batch in batches) == max(8, 8 * BUCKET_WORD_BUDGET // length)
+
+
+def test_fit_batch_respects_measured_memory_cap(extractor):
+    extractor._max_tokens_per_batch = 100
+    assert extractor._fit_batch([10] * 20) == 10
+    # A single text always goes through, even past the cap
+    assert extractor._fit_batch([500, 10]) == 1
+    extractor._max_tokens_per_batch = None
+    assert extractor._fit_batch([500] * 20) == 20
+
+
+# ===== RESULT PARSING =====
+
+def _relation_confidences(extractor, relations, include_confidence=True):
+    raw = {"entities": {}, "relation_extraction": {"knows": relations}}
+    result = extractor._parse_extraction_result(raw, include_confidence=include_confidence)
+    return [relation.confidence for relation in result.relations]
+
+
+def test_relation_score_wins_over_entity_confidences(extractor):
+    relation = ({"text": "A", "confidence": 0.9}, {"text": "B", "confidence": 0.5}, 0.8)
+    assert _relation_confidences(extractor, [relation]) == [0.8]
+
+
+def test_relation_confidence_falls_back_to_entity_mean(extractor):
+    relation = ({"text": "A", "confidence": 0.9}, {"text": "B", "confidence": 0.5})
+    assert _relation_confidences(extractor, [relation]) == [pytest.approx(0.7)]
+
+
+def test_missing_confidences_stay_none(extractor):
+    relations = [
+        # Only one entity confidence known: no mean
+        ({"text": "A", "confidence": 0.9}, "B"),
+        ("A", "B"),
+        {"subject": "A", "object": "B"},
+        {"head": "A", "tail": "B", "score": 0.6},
+    ]
+    assert _relation_confidences(extractor, relations) == [None, None, None, 0.6]
+
+
+def test_confidences_dropped_when_not_requested(extractor):
+    relation = ({"text": "A", "confidence": 0.9}, {"text": "B", "confidence": 0.5}, 0.8)
+    assert _relation_confidences(extractor, [relation], include_confidence=False) == [None]
+
+
+# ===== AUTO DOMAINS =====
+
+def test_auto_domains_extract_once_with_the_merged_schema(monkeypatch, extractor):
+    domains = {"a": [{"label": "code", "confidence": 0.9}], "b": [{"label": "legal", "confidence": 0.9}]}
+    presets = {"code": (["function"], {"calls": "x"}), "legal": (["contract"], {"party_to": "y"})}
+    monkeypatch.setattr(extractor, "classify_domains_batch", lambda texts, **kwargs: [domains[t[0]] for t in texts])
+    monkeypatch.setattr(extractor, "get_preset_schema", lambda names: presets[names[0]])
+    calls = []
+
+    def iter_batch_extract(texts, entity_types=None, relation_types=None, **kwargs):
+        calls.append((list(entity_types), dict(relation_types)))
+        for i in range(len(texts)):
+            entities = [ExtractedEntity(name="f", type="function"), ExtractedEntity(name="c", type="contract")]
+            yield i, ExtractionResult(entities=entities, relations=[], processing_time_ms=0.0)
+
+    monkeypatch.setattr(extractor, "iter_batch_extract", iter_batch_extract)
+    texts = ["a1", "b1", "a2"] * 40
+    results = extractor.batch_extract_with_auto_domains(texts, batch_size=8)
+
+    # One pass for all texts, not one per classification chunk
+    assert calls == [(["function", "contract"], {"calls": "x", "party_to": "y"})]
+    # Each text keeps only its own domain's types
+    expected = [["function"] if text.startswith("a") else ["contract"] for text in texts]
+    assert [[entity.type for entity in result.entities] for result in results] == expected
@@ -0,0 +1,62 @@
+"""Tests for the API handlers and their helpers (the model is never loaded)."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("gliner2")
+
+from fastapi.testclient import TestClient
+
+from main import app, dedupe_texts, fan_out
+from models import ExtractionResult
+
+
+def test_dedupe_texts_keeps_first_seen_order():
+    unique, inverse = dedupe_texts(["b", "a", "b", "c", "a"])
+    assert unique == ["b", "a", "c"]
+    assert inverse == [0, 1, 0, 2, 1]
+
+
+def test_fan_out_round_trip():
+    texts = ["b", "a", "b", "c", "a", "b"]
+    unique, inverse = dedupe_texts(texts)
+    # Unique results may complete in any order (length buckets, streaming)
+    pairs = [(j, unique[j].upper()) for j in (2, 0, 1)]
+
+    fanned = list(fan_out(iter(pairs), inverse))
+    assert sorted(i for i, _ in fanned) == list(range(len(texts)))
+    assert dict(fanned) == {i: text.upper() for i, text in enumerate(texts)}
+
+
+def test_fan_out_empty():
+    unique, inverse = dedupe_texts([])
+    assert unique == [] and inverse == []
+    assert list(fan_out(iter([]), inverse)) == []
+
+
+def test_empty_entity_types_use_server_defaults(monkeypatch):
+    calls = []
+
+    class FakeExtractor:
+        def batch_extract_chunked(self, texts, entity_types=None, **kwargs):
+            calls.append(entity_types)
+            return [ExtractionResult(entities=[], relations=[], processing_time_ms=0.0) for _ in texts]
+
+    monkeypatch.setattr(app.state, "extractor", FakeExtractor(), raising=False)
+    monkeypatch.setattr(app.state, "inference_executor", ThreadPoolExecutor(max_workers=1), raising=False)
+    # Default TS client options: entity_types is []
+    response = TestClient(app).post("/extract/batch", json={"texts": ["a", "b"], "entity_types": []})
+    assert response.status_code == 200
+    assert len(response.json()["results"]) == 2
+    # None: the extractor applies config.DEFAULT_ENTITY_TYPES
+    assert calls == [None]
+
+
+def test_lifespan_shuts_down_the_inference_executor():
+    with TestClient(app) as client:
+        executor = app.state.inference_executor
+        assert client.get("/health").status_code == 200
+    with pytest.raises(RuntimeError):
+        executor.submit(print)
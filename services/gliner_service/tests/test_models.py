@@ -0,0 +1,45 @@
+"""Tests for request validation and coalescing signatures."""
+
+import pytest
+
+from models import BatchExtractionRequest, ExtractionRequest
+
+
+def test_entity_types_are_stripped_and_deduped_in_order():
+    request = ExtractionRequest(text="x", entity_types=[" person", "org ", "person", ""])
+    assert request.entity_types == ["person", "org"]
+
+
+@pytest.mark.parametrize("entity_types", [[], [" ", ""]])
+@pytest.mark.parametrize("model", [ExtractionRequest, BatchExtractionRequest])
+def test_empty_entity_types_fall_back_to_server_defaults(model, entity_types):
+    # The TS client sends entity_types: [] with its default options
+    request = model.model_validate({"text": "x", "texts": ["x"], "entity_types": entity_types})
+    assert request.entity_types is None
+
+
+def test_relation_types_none_empty_and_blank_keys():
+    assert ExtractionRequest(text="x").relation_types is None
+    # {} asks for no relations, it must not fall back to the defaults
+    assert ExtractionRequest(text="x", relation_types={}).relation_types == {}
+    request = ExtractionRequest(text="x", relation_types={" works_for ": "d", "  ": "blank"})
+    assert request.relation_types == {"works_for": "d"}
+
+
+def test_schema_signature_keeps_label_order():
+    a = ExtractionRequest(text="a", entity_types=["person", "org"])
+    b = ExtractionRequest(text="b", entity_types=["person", "org"])
+    permuted = ExtractionRequest(text="c", entity_types=["org", "person"])
+    assert a.schema_signature() == b.schema_signature()
+    assert a.schema_signature() != permuted.schema_signature()
+
+
+def test_schema_signature_separates_defaults_from_explicit_types():
+    assert (
+        ExtractionRequest(text="a").schema_signature()
+        != ExtractionRequest(text="a", relation_types={}).schema_signature()
+    )
+    assert (
+        ExtractionRequest(text="a", entity_types=[]).schema_signature()
+        != ExtractionRequest(text="a").schema_signature()
+    )